@@ -0,0 +1,243 @@
+import json
+import os
+import sys
+import threading
+from functools import partial
+
+import pygame
+
+from game import SCREEN_WIDTH, SCREEN_HEIGHT
+from sound_bank import SoundBank
+from text_cache import TextCache
+
+# 资源文件所在目录（与当前工作目录无关）
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 音效文件：名称 -> (文件名, 音量, 最多同时发声数, 描述)
+SOUND_FILES = {
+    'jump': ('jump.wav', 0.5, 1, '跳跃'),
+    'bounce': ('bounce.wav', 0.6, 2, '弹跳'),
+    'break': ('break.wav', 0.4, 2, '破碎'),
+    'game_over': ('game_over.wav', 0.7, 1, '游戏结束'),
+}
+
+# 中文字体候选（按顺序匹配）；match_font 需要扫描系统字体，结果缓存到磁盘供下次启动使用
+FONT_NAMES = ('simsun', 'simhei')
+FONT_CACHE_FILE = 'font_cache.json'
+
+# 延迟加载：这些属性第一次被访问时才调用对应的加载方法
+LAZY_LOADERS = {
+    'font_path': 'load_fonts',
+    'font': 'load_fonts',
+    'background_image': 'load_background',
+    'use_background_image': 'load_background',
+    'mixer_initialized': 'load_audio',
+    'use_background_music': 'load_audio',
+    'use_sound_effects': 'load_audio',
+    'sounds': 'load_audio',
+}
+
+
+def asset_path(filename):
+    return os.path.join(ASSET_DIR, filename)
+
+
+def cache_dir():
+    # 用户缓存目录（Windows 为 LOCALAPPDATA，其他系统为 XDG_CACHE_HOME 或 ~/.cache）
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ns-shaft')
+
+
+def resolve_font_path(names=FONT_NAMES):
+    # 优先使用缓存的匹配结果；缓存的字体文件已不存在或 pygame 版本变化时重新扫描
+    # （找不到中文字体的结果也会缓存，删除缓存文件即可强制重新扫描）
+    cache_path = os.path.join(cache_dir(), FONT_CACHE_FILE)
+    key = {'names': list(names), 'pygame': pygame.version.ver, 'platform': sys.platform}
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('key') == key and (cached['path'] is None or os.path.exists(cached['path'])):
+            return cached['path']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    path = None
+    for name in names:
+        path = pygame.font.match_font(name)
+        if path:
+            break
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'path': path}, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"无法写入字体缓存: {e}")
+    return path
+
+
+# 资源类：字体、背景图片、背景音乐和音效（需在 set_mode 之后加载）
+# 各项资源在第一次使用时才加载（见 LAZY_LOADERS），load() 一次性全部加载，
+# start_loading() 在后台线程中加载（用于显示加载画面）
+class Assets:
+    def __init__(self):
+        self.audio_loaded = False
+        self.text_cache = TextCache()
+        self.loader = None
+        self.load_progress = 0  # 后台加载已完成的任务数
+        self.load_total = 0
+
+    def __getattr__(self, name):
+        # 只在属性尚未设置时调用；加载方法负责设置同组的全部属性
+        loader = LAZY_LOADERS.get(name)
+        if loader is None:
+            raise AttributeError(name)
+        getattr(self, loader)()
+        return self.__dict__[name]
+
+    def load(self):
+        self.load_fonts()
+        self.load_background()
+        self.load_audio()
+
+    def load_audio(self):
+        self.reset_audio()
+        self.init_mixer()
+        self.load_music()
+        for name in SOUND_FILES:
+            self.load_sound(name)
+        self.finish_audio()
+
+    def start_loading(self):
+        # 在后台线程中解码背景图片、背景音乐和音效，主线程用 loading_done() 轮询，
+        # 完成后调用 finish_loading()；加载期间访问这些属性得到的是未加载时的默认值
+        self.use_background_image = False
+        self.background_image = None
+        self.reset_audio()
+        self.init_mixer()
+
+        tasks = [self.decode_background]
+        if self.mixer_initialized:
+            tasks.append(self.load_music)
+            tasks.extend(partial(self.load_sound, name) for name in SOUND_FILES)
+        self.load_total = len(tasks)
+        self.load_progress = 0
+        self.loader = threading.Thread(target=self._run_tasks, args=(tasks,), daemon=True)
+        self.loader.start()
+
+    def _run_tasks(self, tasks):
+        for task in tasks:
+            task()
+            self.load_progress += 1
+
+    def loading_done(self):
+        return self.loader is None or not self.loader.is_alive()
+
+    def finish_loading(self):
+        # 在主线程调用：转换图片像素格式、分配音效声道
+        if self.loader:
+            self.loader.join()
+            self.loader = None
+        self.convert_background()
+        self.finish_audio()
+
+    def reset_audio(self):
+        self.mixer_initialized = False
+        self.use_background_music = False
+        self.use_sound_effects = False
+        self.sounds = SoundBank()
+
+    def finish_audio(self):
+        if self.mixer_initialized:
+            self.sounds.reserve_channels()
+        self.audio_loaded = True
+
+    def init_mixer(self):
+        # 尝试初始化混音器（用于音频播放）
+        try:
+            pygame.mixer.init()
+            self.mixer_initialized = True
+        except pygame.error:
+            self.mixer_initialized = False
+            print("警告: 音频系统初始化失败，无法播放音乐和音效")
+
+    def load_fonts(self):
+        # 确保中文正常显示
+        pygame.font.init()
+        self.font_path = resolve_font_path()
+        self.font = self.get_font(24)
+
+    def get_font(self, size):
+        # 如果找不到中文字体，使用默认字体
+        if self.font_path:
+            return pygame.font.Font(self.font_path, size)
+        return pygame.font.Font(None, size)
+
+    def load_background(self):
+        self.decode_background()
+        self.convert_background()
+
+    def decode_background(self):
+        # 尝试加载背景图片（可在加载线程中调用，像素格式转换留给 convert_background）
+        self.use_background_image = False
+        self.background_image = None
+        try:
+            background_image = pygame.image.load(asset_path('background.png'))
+            self.background_image = pygame.transform.scale(background_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.use_background_image = True
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"无法加载背景图片: {e}")
+            print("将使用黑色背景代替")
+
+    def convert_background(self):
+        # 转换为显示格式以加快绘制（需要已创建窗口）
+        if self.background_image is not None and pygame.display.get_surface():
+            self.background_image = self.background_image.convert()
+
+    def load_music(self):
+        # 背景音乐
+        if self.mixer_initialized and os.path.exists(asset_path('background_music.mp3')):
+            try:
+                pygame.mixer.music.load(asset_path('background_music.mp3'))
+                pygame.mixer.music.set_volume(0.3)  # 音量设置为30%
+                self.use_background_music = True
+            except pygame.error as e:
+                print(f"无法加载背景音乐: {e}")
+
+    def load_sound(self, name):
+        if not self.mixer_initialized:
+            return
+
+        filename, volume, voices, description = SOUND_FILES[name]
+        path = asset_path(filename)
+        if os.path.exists(path):
+            try:
+                sound = pygame.mixer.Sound(path)
+                sound.set_volume(volume)
+                self.sounds.add(name, sound, voices)
+                self.use_sound_effects = True
+            except pygame.error as e:
+                print(f"无法加载{description}音效: {e}")
+
+    def play_sound(self, name):
+        # 通过音效库的预留声道播放，限制同一音效同时发声的数量
+        if self.use_sound_effects:
+            self.sounds.play(name)
+
+    def play_music(self):
+        if self.use_background_music:
+            pygame.mixer.music.play(-1)  # -1表示循环播放
+
+    def stop_music(self):
+        if self.use_background_music:
+            pygame.mixer.music.stop()
+
+    def pause_music(self):
+        if self.use_background_music:
+            pygame.mixer.music.pause()
+
+    def unpause_music(self):
+        if self.use_background_music:
+            pygame.mixer.music.unpause()
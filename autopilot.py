@@ -0,0 +1,173 @@
+import argparse
+import itertools
+import multiprocessing
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from batch import BatchGame
+from game import Game, FPS, SCREEN_HEIGHT, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+
+# 自动驾驶：从当前状态出发，用 BatchGame 同步推演所有候选输入序列若干秒，执行得分最高的一条
+# 候选序列把推演时长分为 SEGMENTS 段，每段选择 左/不动/右 以及是否跳跃（6 ** 3 = 216 条）
+# 一次搜索分摊到 REPLAN_TICKS 帧内完成：推演先执行这段时间内已确定的输入，再接各条候选序列，
+# 搜索完成时游戏恰好走到候选序列的起点（推演与 Game 逐帧一致）
+# 可用于菜单的演示模式（main.py --autopilot）和无头压力测试（python autopilot.py）
+
+HORIZON = 2 * FPS  # 候选序列的推演帧数
+SEGMENTS = 3
+REPLAN_TICKS = 10  # 每次搜索分摊的帧数，也是两次搜索之间执行的帧数
+UPCOMING_PLATFORMS = 16  # 推演时可能加入的平台数
+SEGMENT_ACTIONS = [direction | jump for direction in (0, INPUT_LEFT, INPUT_RIGHT) for jump in (0, INPUT_JUMP)]
+
+
+def build_plans(horizon=HORIZON, segments=SEGMENTS):
+    # 所有候选序列，形状为 (候选数, horizon)
+    bounds = np.linspace(0, horizon, segments + 1).astype(int)
+    plans = []
+    for actions in itertools.product(SEGMENT_ACTIONS, repeat=segments):
+        plan = np.empty(horizon, dtype=np.int64)
+        for action, start, end in zip(actions, bounds, bounds[1:]):
+            plan[start:end] = action
+        plans.append(plan)
+    return np.array(plans)
+
+
+class Rollouts:
+    # 从同一个快照出发、按 plans 的每一行输入同步推演，可分多次推进
+    def __init__(self, state, upcoming, plans):
+        self.batch = BatchGame.from_state(state, len(plans), upcoming)
+        self.plans = plans
+        self.tick = 0
+
+    @property
+    def done(self):
+        return self.tick >= self.plans.shape[1]
+
+    def advance(self, ticks):
+        batch = self.batch
+        end = min(self.tick + ticks, self.plans.shape[1])
+        while self.tick < end:
+            if batch.game_over.all():
+                self.tick = self.plans.shape[1]
+                break
+            batch.step(self.plans[:, self.tick])
+            self.tick += 1
+
+    def scores(self):
+        # 先比存活帧数，再比分数、生命值，最后倾向于停留在屏幕中部
+        batch = self.batch
+        centered = np.abs(batch.player_y - SCREEN_HEIGHT // 2)
+        return batch.ticks * 1000.0 + batch.score * 10 + batch.health * 5 - centered
+
+
+def evaluate(state, upcoming, plans):
+    rollouts = Rollouts(state, upcoming, plans)
+    rollouts.advance(plans.shape[1])
+    return rollouts.scores()
+
+
+def _evaluate_task(task):
+    return evaluate(*task)
+
+
+class Autopilot:
+    def __init__(self, horizon=HORIZON, segments=SEGMENTS, replan=REPLAN_TICKS, workers=1):
+        # workers > 1 时候选序列分给进程池并行推演，主进程不等待
+        self.candidates = build_plans(horizon, segments)
+        self.replan = replan
+        self.ticks_per_call = -(-(replan + horizon) // replan)  # 每帧推进的推演帧数
+        self.workers = workers
+        self.pool = multiprocessing.Pool(workers) if workers > 1 else None
+        self.queue = deque()  # 待执行的输入
+        self.search = None  # 进行中的搜索：Rollouts 或进程池的 AsyncResult 列表
+        self.remaining = 0  # 距离本次搜索完成还需执行的帧数
+        self.call_time = 0.0
+
+    def _start_search(self, game):
+        # 推演从当前状态开始，前 replan 帧执行已确定的输入（不足时补 0）
+        while len(self.queue) < self.replan:
+            self.queue.append(0)
+        prefix = np.array(list(itertools.islice(self.queue, self.replan)), dtype=np.int64)
+        plans = np.hstack([np.tile(prefix, (len(self.candidates), 1)), self.candidates])
+        state = game.get_state()
+        upcoming = game.upcoming_platforms(UPCOMING_PLATFORMS)
+        if self.pool:
+            chunks = np.array_split(plans, self.workers)
+            self.search = [self.pool.apply_async(_evaluate_task, ((state, upcoming, chunk),)) for chunk in chunks]
+        else:
+            self.search = Rollouts(state, upcoming, plans)
+
+    def _finish_search(self):
+        if self.pool:
+            scores = np.concatenate([result.get() for result in self.search])
+        else:
+            self.search.advance(self.search.plans.shape[1])
+            scores = self.search.scores()
+        self.search = None
+        # 此时前缀已执行完，接着执行最佳候选序列
+        self.queue = deque(self.candidates[int(np.argmax(scores))].tolist())
+
+    def __call__(self, game):
+        # 返回本帧的输入位；call_time 记录本次调用的耗时（秒）
+        start = time.perf_counter()
+        if self.search is None:
+            self._start_search(game)
+            self.remaining = self.replan
+        if not self.pool:
+            self.search.advance(self.ticks_per_call)
+        inputs = self.queue.popleft()
+        self.remaining -= 1
+        if self.remaining == 0:
+            self._finish_search()
+        self.call_time = time.perf_counter() - start
+        return inputs
+
+    def reset(self):
+        # 新的一局开始时调用（进行中的搜索作废）
+        self.queue.clear()
+        self.search = None
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+def main(argv=None):
+    # 无头压力测试：用自动驾驶连续玩若干局，统计存活时间与每帧耗时
+    parser = argparse.ArgumentParser(description="NS-Shaft 自动驾驶压力测试")
+    parser.add_argument('--games', type=int, default=10, help="对局数")
+    parser.add_argument('--seed', type=int, default=0, help="第一局的种子")
+    parser.add_argument('--max-seconds', type=float, default=120, help="每局最长时间（秒）")
+    parser.add_argument('--workers', type=int, default=1, help="并行推演的进程数")
+    args = parser.parse_args(argv)
+
+    pilot = Autopilot(workers=args.workers)
+    max_ticks = int(args.max_seconds * FPS)
+    call_times = []
+    try:
+        for seed in range(args.seed, args.seed + args.games):
+            game = Game(seed=seed)
+            pilot.reset()
+            ticks = 0
+            while not game.game_over and ticks < max_ticks:
+                game.step(pilot(game))
+                call_times.append(pilot.call_time)
+                ticks += 1
+            print(f"种子 {seed}: 存活 {ticks / FPS:.1f} 秒  层数 {game.player.level}  分数 {game.score}  "
+                  f"{'结束' if game.game_over else '未结束'}")
+    finally:
+        pilot.close()
+
+    times = np.array(call_times) * 1000
+    print(f"{len(pilot.candidates)} 条候选 × {pilot.candidates.shape[1]} 帧，每帧耗时：平均 {times.mean():.2f} ms，"
+          f"p99 {np.percentile(times, 99):.2f} ms，最大 {times.max():.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import numpy as np
+
+from game import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, PLAYER_SIZE, PLAYER_SPEED, PLATFORM_WIDTH,
+    PLATFORM_SPEED, MAX_PLATFORM_SPEED, GRAVITY, JUMP_POWER, MAX_FALL_SPEED, MAX_PLATFORMS,
+    START_PLATFORM_Y, SPAWN_Y, GAME_STATE_SIZE, JUMP_BUFFER_TICKS, COYOTE_TICKS, Player, Platform,
+    PLATFORM_MOVING, PLATFORM_BREAKING, PLATFORM_BOUNCY,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_PAUSE,
+)
+from level_gen import LevelStream, PlatformList
+from platform_grid import LANDING_TOLERANCE
+
+# 批量模拟器：用 NumPy 数组同步推进 N 局游戏
+# 每局的逻辑与 game.Game 逐帧一致（相同 seed 与输入序列得到相同结果）
+
+
+def round_rect(values):
+    # 与 pygame.Rect 赋值浮点数时的取整方式一致（四舍五入，.5 远离零）
+    result = np.trunc(values)
+    result += np.where(np.abs(values - result) >= 0.5, np.sign(values), 0)
+    return result.astype(np.int64)
+
+
+class BatchGame:
+    def __init__(self, seeds, level_streams=None):
+        # 传入 level_streams 时不生成初始平台，由调用者设置初始状态（见 from_state）
+        self.seeds = list(seeds)
+        self.level_streams = level_streams or [LevelStream(seed) for seed in self.seeds]
+        n = len(self.seeds)
+        self.n = n
+
+        # 玩家状态
+        self.player_x = np.zeros(n, dtype=np.int64)
+        self.player_y = np.zeros(n, dtype=np.int64)
+        self.vel_x = np.zeros(n, dtype=np.int64)
+        self.vel_y = np.zeros(n, dtype=np.float64)
+        self.on_ground = np.zeros(n, dtype=bool)
+        self.health = np.full(n, 100, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.jump_buffer = np.zeros(n, dtype=np.int64)
+        self.air_ticks = np.zeros(n, dtype=np.int64)
+
+        # 游戏状态
+        self.platform_speed = np.full(n, PLATFORM_SPEED, dtype=np.float64)
+        self.distance = np.zeros(n, dtype=np.float64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.paused = np.zeros(n, dtype=bool)
+        self.ticks = np.zeros(n, dtype=np.int64)  # 每局实际推进的帧数（存活时间）
+
+        # 平台状态：每局 MAX_PLATFORMS 个槽位，serial 记录加入顺序（同高平台按加入顺序取第一个）
+        shape = (n, MAX_PLATFORMS)
+        self.alive = np.zeros(shape, dtype=bool)
+        self.platform_x = np.zeros(shape, dtype=np.int64)
+        self.platform_y = np.zeros(shape, dtype=np.int64)
+        self.platform_type = np.zeros(shape, dtype=np.int8)
+        self.move_direction = np.ones(shape, dtype=np.int64)
+        self.break_timer = np.zeros(shape, dtype=np.int64)
+        self.serial = np.zeros(shape, dtype=np.int64)
+        self.next_serial = 0
+
+        # 每局关卡流中下一个待加入的平台 (x, 高度, 类型)，高度另存一份数组用于批量判断
+        self.next_platforms = [stream.next() for stream in self.level_streams]
+        self.next_altitude = np.array([platform[1] for platform in self.next_platforms], dtype=np.float64)
+
+        if level_streams is None:
+            self.create_initial_platforms()
+
+    @classmethod
+    def from_state(cls, state, count, upcoming=()):
+        # count 局都从同一个 Game.get_state 快照开始（用于并行推演不同的输入），
+        # upcoming 为之后依次加入的平台（Game.upcoming_platforms）
+        batch = cls([0] * count, [PlatformList(upcoming) for _ in range(count)])
+        batch.load_state(state)
+        return batch
+
+    def load_state(self, state):
+        # 每局都设为同一个 Game.get_state 快照
+        self.platform_speed[:] = state[0]
+        self.score[:] = state[1]
+        self.game_over[:] = bool(state[2])
+        self.paused[:] = bool(state[3])
+        self.distance[:] = state[4]
+        self.ticks[:] = 0
+
+        x, y, vel_x, vel_y, on_ground, _, health, level, jump_buffer, air_ticks = \
+            state[GAME_STATE_SIZE:GAME_STATE_SIZE + Player.STATE_SIZE]
+        self.player_x[:] = x
+        self.player_y[:] = y
+        self.vel_x[:] = vel_x
+        self.vel_y[:] = vel_y
+        self.on_ground[:] = bool(on_ground)
+        self.health[:] = health
+        self.level[:] = level
+        self.jump_buffer[:] = jump_buffer
+        self.air_ticks[:] = air_ticks
+
+        platforms = np.array(state[GAME_STATE_SIZE + Player.STATE_SIZE:]).reshape(-1, Platform.STATE_SIZE)
+        count = len(platforms)
+        self.alive[:] = False
+        self.alive[:, :count] = True
+        self.platform_x[:, :count] = platforms[:, 0]
+        self.platform_y[:, :count] = platforms[:, 1]
+        self.platform_type[:, :count] = platforms[:, 2]
+        self.move_direction[:, :count] = platforms[:, 3]
+        self.break_timer[:, :count] = platforms[:, 4]
+        self.serial[:, :count] = platforms[:, 5]
+        self.next_serial = int(state[6])
+
+    def create_initial_platforms(self):
+        # 起始弹簧平台与玩家位置（与 Game.create_initial_platforms 相同）
+        start_x = np.array([platform[0] for platform in self.next_platforms], dtype=np.int64)
+        self.player_x[:] = start_x + PLATFORM_WIDTH // 2 - PLAYER_SIZE // 2
+        self.player_y[:] = START_PLATFORM_Y - PLAYER_SIZE
+        self.on_ground[:] = True
+        self.spawn_platforms(np.ones(self.n, dtype=bool))
+
+    def spawn_platforms(self, active):
+        # 与 Game.spawn_platforms 相同：下一个平台滚动到屏幕上方时加入；每轮为所有到期的局各加入一个平台
+        limit = START_PLATFORM_Y - SPAWN_Y
+        due = active & (self.next_altitude - self.distance <= limit)
+        if not due.any():
+            return
+        count = self.alive.sum(axis=1)
+        while True:
+            games = np.nonzero(due & (self.next_altitude - self.distance <= limit) & (count < MAX_PLATFORMS))[0]
+            if not len(games):
+                break
+            platforms = [self.next_platforms[g] for g in games]
+            xs = np.array([platform[0] for platform in platforms], dtype=np.int64)
+            types = np.array([platform[2] for platform in platforms], dtype=np.int64)
+            # np.rint 与 round 一样四舍六入五成双
+            ys = np.rint(START_PLATFORM_Y - self.next_altitude[games] + self.distance[games]).astype(np.int64)
+            self.add_platforms(games, xs, ys, types)
+            count[games] += 1
+            for g in games:
+                platform = self.level_streams[g].next()
+                self.next_platforms[g] = platform
+                self.next_altitude[g] = platform[1]
+
+    def add_platforms(self, games, xs, ys, types):
+        # 每局放入第一个空槽位
+        slots = np.argmin(self.alive[games], axis=1)
+        self.alive[games, slots] = True
+        self.platform_x[games, slots] = xs
+        self.platform_y[games, slots] = ys
+        self.platform_type[games, slots] = types
+        self.move_direction[games, slots] = 1
+        self.break_timer[games, slots] = 0
+        self.serial[games, slots] = np.arange(self.next_serial, self.next_serial + len(games))
+        self.next_serial += len(games)
+
+    def step(self, inputs):
+        # inputs: 长度为 N 的 INPUT_* 位组合数组，对应 Game.step
+        inputs = np.asarray(inputs)
+
+        # 跳跃（与 Player.jump 一样不受暂停影响）：按键时开始缓冲，能起跳时（含土狼时间）起跳
+        self.jump_buffer[(inputs & INPUT_JUMP) != 0] = JUMP_BUFFER_TICKS
+        can_jump = self.on_ground | ((self.air_ticks <= COYOTE_TICKS) & (self.vel_y >= 0))
+        jumping = (self.jump_buffer > 0) & can_jump
+        self.vel_y[jumping] = JUMP_POWER
+        self.jump_buffer[jumping] = 0
+
+        self.paused ^= (inputs & INPUT_PAUSE) != 0
+
+        moving = ~self.paused
+        left = (inputs & INPUT_LEFT) != 0
+        right = ((inputs & INPUT_RIGHT) != 0) & ~left
+        self.vel_x[moving] = np.where(left, -PLAYER_SPEED, np.where(right, PLAYER_SPEED, 0))[moving]
+
+        self.update()
+
+    def update(self):
+        active = ~(self.game_over | self.paused)
+        if not active.any():
+            return
+        self.ticks += active
+
+        # 跳跃缓冲倒计时与离开平台的帧数（on_ground 仍是上一帧的结果）
+        self.jump_buffer -= active & (self.jump_buffer > 0)
+        self.air_ticks = np.where(active, np.where(self.on_ground, 0, self.air_ticks + 1), self.air_ticks)
+
+        # 玩家：重力、位移与左右边界
+        vel_y = np.where(active, np.minimum(self.vel_y + GRAVITY, MAX_FALL_SPEED), self.vel_y)
+        self.vel_y = vel_y
+        prev_bottom = (self.player_y + PLAYER_SIZE)[:, None]
+        self.player_x = np.where(active, np.clip(self.player_x + self.vel_x, 0, SCREEN_WIDTH - PLAYER_SIZE),
+                                 self.player_x)
+        self.player_y = np.where(active, round_rect(self.player_y + vel_y), self.player_y)
+        self.on_ground &= ~active
+
+        # 平台碰撞（对应 Player.check_collision 的扫掠检测，取最高的平台，同高时取先加入的）
+        bottom = (self.player_y + PLAYER_SIZE)[:, None]
+        left = self.player_x[:, None]
+        top = self.platform_y
+        hits = (self.alive & active[:, None] &
+                (top >= prev_bottom - LANDING_TOLERANCE) & (top <= bottom) &
+                (left + PLAYER_SIZE >= self.platform_x) & (left <= self.platform_x + PLATFORM_WIDTH) &
+                (vel_y > 0)[:, None])
+        landed = hits.any(axis=1)
+        if landed.any():
+            games = np.nonzero(landed)[0]
+            order = (self.platform_y[games] + SCREEN_HEIGHT) * (1 << 40) + self.serial[games]
+            slots = np.argmin(np.where(hits[games], order, np.iinfo(np.int64).max), axis=1)
+            platform_y = self.platform_y[games, slots]
+            platform_type = self.platform_type[games, slots]
+
+            self.on_ground[games] = True
+            self.vel_y[games] = 0
+            self.player_y[games] = platform_y - PLAYER_SIZE
+
+            breaking = platform_type == PLATFORM_BREAKING
+            self.break_timer[games[breaking], slots[breaking]] = FPS
+            bouncy = games[platform_type == PLATFORM_BOUNCY]
+            self.vel_y[bouncy] = JUMP_POWER * 1.5  # 弹力平台跳得更高
+
+            # 更新层数
+            scored = games[(platform_y < SCREEN_HEIGHT // 2) & (platform_y > self.player_y[games])]
+            self.level[scored] += 1
+            self.score[scored] += 10
+
+        # 平台滚动、移动平台折返、破碎计时
+        updating = self.alive & active[:, None]
+        self.distance += np.where(active, self.platform_speed, 0)
+        self.platform_y = np.where(updating, round_rect(self.platform_y + self.platform_speed[:, None]),
+                                   self.platform_y)
+
+        moving = updating & (self.platform_type == PLATFORM_MOVING)
+        self.platform_x += np.where(moving, self.move_direction * 2, 0)
+        bounce = moving & ((self.platform_x <= 0) | (self.platform_x + PLATFORM_WIDTH >= SCREEN_WIDTH))
+        self.move_direction[bounce] *= -1
+
+        breaking = updating & (self.platform_type == PLATFORM_BREAKING) & (self.break_timer > 0)
+        self.break_timer -= breaking
+        broken = breaking & (self.break_timer == 0)
+        self.alive &= ~(broken | (updating & (self.platform_y > SCREEN_HEIGHT)))
+
+        # 生成新平台
+        self.spawn_platforms(active)
+
+        # 增加难度（限制平台速度上限）
+        faster = active & (self.score % 100 == 0) & (self.score > 0) & (self.platform_speed < MAX_PLATFORM_SPEED)
+        self.platform_speed[faster] += 0.1
+
+        # 检查游戏结束条件
+        self.game_over |= active & ((self.player_y > SCREEN_HEIGHT) | (self.player_y < -50) | (self.health <= 0))
+
+        # 尖刺天花板
+        spiked = active & (self.player_y < 0)
+        self.health[spiked] -= 10
+        self.vel_y[spiked] = 5
+
+    def run(self, policy, max_ticks):
+        # policy(batch) 返回本帧的输入数组；所有局结束或达到 max_ticks 时停止
+        for _ in range(max_ticks):
+            if self.game_over.all():
+                break
+            self.step(policy(self))
+        return self.ticks
+
+    def get_platforms(self, index):
+        # 按加入顺序返回第 index 局的平台 (x, y, type, break_timer)
+        slots = np.nonzero(self.alive[index])[0]
+        slots = slots[np.argsort(self.serial[index, slots])]
+        return [(int(self.platform_x[index, s]), int(self.platform_y[index, s]),
+                 int(self.platform_type[index, s]), int(self.break_timer[index, s])) for s in slots]
@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import platform as platform_info
+import random
+import sys
+import time
+
+# 使用 SDL 虚拟显示驱动，无需真实窗口即可测量绘制耗时
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from game import (
+    Game, SCREEN_WIDTH, SCREEN_HEIGHT, PLATFORM_WIDTH,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP,
+)
+
+# 性能基准：更新、碰撞、平台生成/回收与绘制
+# 结果以 JSON 保存，并可与基准文件比较以发现性能退化
+
+COLLISION_COUNTS = (15, 60, 240, 960)
+DEFAULT_TOLERANCE = 0.10  # 允许的性能波动（10%）
+
+
+def scripted_inputs(seed, ticks):
+    # 固定种子生成的输入序列：按住方向键一段时间，间或跳跃
+    rng = random.Random(seed)
+    inputs = []
+    direction = 0
+    for _ in range(ticks):
+        if rng.random() < 0.05:
+            direction = rng.choice((0, INPUT_LEFT, INPUT_RIGHT))
+        inputs.append(direction | (INPUT_JUMP if rng.random() < 0.03 else 0))
+    return inputs
+
+
+def best_of(repeat, func):
+    # 重复测量取最快的一次，降低系统噪声的影响
+    return min(func() for _ in range(repeat))
+
+
+def bench_update(ticks, repeat):
+    inputs = scripted_inputs(1, ticks)
+
+    def run():
+        seed = 0
+        game = Game(seed=seed)
+        elapsed = 0.0
+        start = time.perf_counter()
+        for m in inputs:
+            if game.game_over:
+                # 新开一局（含关卡预生成）不计入耗时，只测 Game.update
+                elapsed += time.perf_counter() - start
+                seed += 1
+                game.restart(seed)
+                start = time.perf_counter()
+            game.step(m)
+        return elapsed + time.perf_counter() - start
+
+    return ticks / best_of(repeat, run)
+
+
+def bench_collision(count, calls, repeat):
+    # 在整个屏幕高度内放置 count 个平台，测量单次落地检测的耗时
+    game = Game(seed=count)
+    game.platforms.clear()
+    rng = random.Random(count)
+    for _ in range(count):
+        x = rng.randint(0, SCREEN_WIDTH - PLATFORM_WIDTH)
+        y = rng.randint(-50, SCREEN_HEIGHT)
+        game.platforms.add(game.pool.acquire(x, y, rng.randint(0, 3)))
+
+    player = game.player
+    positions = [(rng.randint(0, SCREEN_WIDTH - player.width), rng.randint(0, SCREEN_HEIGHT))
+                 for _ in range(calls)]
+
+    def run():
+        start = time.perf_counter()
+        for x, y in positions:
+            player.rect.x = x
+            player.rect.y = y
+            player.prev_bottom = player.rect.bottom - 10
+            player.vel_y = 10
+            player.check_collision(game.platforms)
+        return time.perf_counter() - start
+
+    return best_of(repeat, run) / calls * 1e9
+
+
+def bench_spawn(ticks, repeat):
+    # 平台高速滚动，使平台不断被回收和生成，统计每秒生成的平台数
+    def run():
+        game = Game(seed=2)
+        game.player.health = 10 ** 9
+        game.platform_speed = 40
+        first = game.platforms.next_serial
+        start = time.perf_counter()
+        for _ in range(ticks):
+            # 让玩家停在屏幕中间，只测平台的生成与回收
+            game.player.rect.y = SCREEN_HEIGHT // 2
+            game.player.vel_y = 0
+            game.update()
+        elapsed = time.perf_counter() - start
+        return elapsed / (game.platforms.next_serial - first)
+
+    return 1 / best_of(repeat, run)
+
+
+def bench_draw(frames, repeat, use_background, dirty=False):
+    from assets import Assets
+    from render import DirtyRenderer
+
+    screen = pygame.display.get_surface() or pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    assets = Assets()
+    assets.load()
+    assets.use_background_image = use_background and assets.background_image is not None
+    inputs = scripted_inputs(3, frames)
+
+    def run():
+        game = Game(assets, seed=3)
+        renderer = DirtyRenderer(screen, assets) if dirty else None
+        total = 0
+        for m in inputs:
+            if game.game_over:
+                game.restart(3)
+            game.step(m)
+            start = time.perf_counter()
+            if renderer:
+                renderer.draw(game)
+            else:
+                game.draw(screen)
+            total += time.perf_counter() - start
+        return total
+
+    return best_of(repeat, run) / frames * 1000
+
+
+def run_benchmarks(quick=False):
+    scale = 0.1 if quick else 1
+    repeat = 2 if quick else 5
+    results = {}
+
+    def record(name, value, unit, higher_is_better):
+        results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+        print(f"{name:32s} {value:14.3f} {unit}")
+
+    record('update_ticks_per_sec', bench_update(int(20000 * scale), repeat), 'ticks/s', True)
+    for count in COLLISION_COUNTS:
+        record(f'collision_ns_{count}_platforms', bench_collision(count, int(20000 * scale), repeat), 'ns/call', False)
+    record('spawn_cull_per_sec', bench_spawn(int(20000 * scale), repeat), 'platforms/s', True)
+
+    frames = int(600 * scale)
+    record('draw_ms_background', bench_draw(frames, repeat, True), 'ms/frame', False)
+    record('draw_ms_no_background', bench_draw(frames, repeat, False), 'ms/frame', False)
+    record('draw_dirty_ms_background', bench_draw(frames, repeat, True, dirty=True), 'ms/frame', False)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # 返回退化的指标列表：(名称, 基准值, 当前值, 变化比例)
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base or not base['value']:
+            continue
+        change = result['value'] / base['value'] - 1
+        worse = -change if result['higher_is_better'] else change
+        print(f"{name:32s} {base['value']:14.3f} -> {result['value']:14.3f} {change:+7.1%}")
+        if worse > tolerance:
+            regressions.append((name, base['value'], result['value'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NS-Shaft 性能基准")
+    parser.add_argument('--output', default='bench_results.json', help="结果 JSON 文件")
+    parser.add_argument('--baseline', help="与该基准文件比较，有退化时返回非零退出码")
+    parser.add_argument('--save-baseline', metavar='PATH', help="把本次结果另存为基准文件")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="允许的退化比例")
+    parser.add_argument('--quick', action='store_true', help="减少迭代次数，快速检查")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    results = run_benchmarks(args.quick)
+    report = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform_info.python_version(),
+            'pygame': pygame.version.ver,
+            'machine': platform_info.platform(),
+            'quick': args.quick,
+        },
+        'results': results,
+    }
+    pygame.quit()
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"发现 {len(regressions)} 项性能退化（超过 {args.tolerance:.0%}）:")
+            for name, base, value, change in regressions:
+                print(f"  {name}: {base:.3f} -> {value:.3f} ({change:+.1%})")
+            return 1
+        print("未发现性能退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
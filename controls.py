@@ -0,0 +1,100 @@
+import time
+from array import array
+
+import pygame
+
+from game import INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_PAUSE
+from profiler import percentile
+
+# 输入层：只接收游戏用到的事件类型，由 KEYDOWN/KEYUP 维护按住的方向键（不再轮询 get_pressed），
+# 单次按键带时间戳排队，由下一个模拟步一次性取走；并统计从取到按键到画面呈现的延迟
+
+ALLOWED_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.WINDOWEXPOSED, pygame.WINDOWSIZECHANGED]
+
+JUMP_KEYS = (pygame.K_SPACE, pygame.K_UP)
+LATENCY_SAMPLES = 256  # 保留最近多少次按键的延迟
+
+
+def allow_events():
+    # 其余事件（鼠标移动、文字输入等）不再进入队列
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(ALLOWED_EVENTS)
+
+
+class InputState:
+    def __init__(self):
+        self.left = False
+        self.right = False
+        self.rewind = False  # 按住 Backspace 倒带
+        self.presses = 0  # 尚未被模拟步取走的单次按键（INPUT_JUMP / INPUT_PAUSE）
+        self.press_times = []  # 这些按键被取到的时间（perf_counter）
+        self.applied_times = []  # 已被模拟步应用、等待画面呈现的按键时间
+        self.latency = array('d', bytes(8 * LATENCY_SAMPLES))  # 单位：秒
+        self.latency_count = 0
+
+    def handle(self, event, now=None):
+        # 处理游戏中的按键事件；返回 True 表示事件已被消费
+        if event.type not in (pygame.KEYDOWN, pygame.KEYUP):
+            return False
+        down = event.type == pygame.KEYDOWN
+        key = event.key
+        if key == pygame.K_LEFT:
+            self.left = down
+        elif key == pygame.K_RIGHT:
+            self.right = down
+        elif key == pygame.K_BACKSPACE:
+            self.rewind = down
+        elif down and key in JUMP_KEYS:
+            self._press(INPUT_JUMP, now)
+        elif down and key == pygame.K_p:
+            self._press(INPUT_PAUSE, now)
+        else:
+            return False
+        return True
+
+    def _press(self, bit, now):
+        self.presses |= bit
+        self.press_times.append(time.perf_counter() if now is None else now)
+
+    @property
+    def held(self):
+        # 与原先轮询时相同：同时按住时左键优先
+        if self.left:
+            return INPUT_LEFT
+        if self.right:
+            return INPUT_RIGHT
+        return 0
+
+    def take(self):
+        # 本模拟步的单次按键，只作用于一步
+        presses = self.presses
+        if presses:
+            self.presses = 0
+            self.applied_times += self.press_times
+            self.press_times.clear()
+        return presses
+
+    def presented(self, now=None):
+        # 画面呈现（flip/update）后调用，记录已应用按键的延迟
+        if not self.applied_times:
+            return
+        now = time.perf_counter() if now is None else now
+        for pressed in self.applied_times:
+            self.latency[self.latency_count % LATENCY_SAMPLES] = now - pressed
+            self.latency_count += 1
+        self.applied_times.clear()
+
+    def release_all(self):
+        # 离开游戏画面时调用，避免按键状态残留
+        self.left = self.right = self.rewind = False
+        self.presses = 0
+        self.press_times.clear()
+        self.applied_times.clear()
+
+    def latency_stats(self):
+        # 返回 (样本数, p50, p99, 最大值)，单位毫秒
+        count = min(self.latency_count, LATENCY_SAMPLES)
+        values = sorted(self.latency[:count])
+        if not values:
+            return 0, 0.0, 0.0, 0.0
+        return count, percentile(values, 0.5) * 1000, percentile(values, 0.99) * 1000, values[-1] * 1000
@@ -0,0 +1,676 @@
+import random
+from array import array
+
+import pygame
+
+from platform_grid import PlatformGrid
+from profiler import PHASE_PLAYER, PHASE_COLLISION, PHASE_PLATFORMS, PHASE_SPAWN, PHASE_RULES
+from text_cache import HudText
+
+# 游戏核心逻辑（与显示窗口、混音器、字体解耦，可无头运行）
+
+# 游戏窗口设置
+SCREEN_WIDTH = 400
+SCREEN_HEIGHT = 600
+
+# 颜色定义
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+GRAY = (128, 128, 128)
+
+# 游戏常量
+FPS = 60
+PLAYER_SIZE = 20
+PLAYER_SPEED = 5  # 左右移动速度
+PLATFORM_WIDTH = 60
+PLATFORM_HEIGHT = 10
+PLATFORM_SPEED = 1
+MAX_PLATFORM_SPEED = 1.5  # 平台速度上限
+GRAVITY = 0.5
+JUMP_POWER = -12
+MAX_FALL_SPEED = 15
+MAX_PLATFORMS = 15  # 最大平台数量
+SPIKE_HEIGHT = 15  # 尖刺天花板高度
+JUMP_BUFFER_TICKS = 6  # 空中按下跳跃后，在这么多帧内落地仍会起跳
+COYOTE_TICKS = 6  # 离开平台后这么多帧内仍可起跳
+BREAK_FRAMES = 4  # 破碎平台的碎裂动画帧数
+SEED_RANGE = 2 ** 32  # 随机种子取值范围
+START_PLATFORM_Y = SCREEN_HEIGHT - 100  # 起始平台（关卡高度 0）在屏幕上的位置
+SPAWN_Y = -50  # 新平台在屏幕上方出现的位置
+
+# 平台类型
+PLATFORM_NORMAL = 0
+PLATFORM_MOVING = 1
+PLATFORM_BREAKING = 2
+PLATFORM_BOUNCY = 3
+
+# HUD 布局：(文字模板, 位置)
+HUD_LAYOUT = [
+    ("生命值: {}", (10, 10)),
+    ("层数: {}", (10, 40)),
+    ("速度: {:.1f}", (10, 70)),
+    ("分数: {}", (10, 100)),
+]
+
+# 输入位（Game.step 的参数为以下各位的组合）
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+INPUT_PAUSE = 8
+
+# 状态快照（Game.get_state）：扁平的 array('d')，依次为 GAME_STATE_SIZE 个全局字段、
+# Player.STATE_SIZE 个玩家字段，以及每个平台 Platform.STATE_SIZE 个字段（按加入顺序）
+GAME_STATE_SIZE = 7
+
+
+# 玩家类 (继承自pygame.sprite.Sprite)
+class Player(pygame.sprite.Sprite):
+    STATE_SIZE = 10
+
+    def __init__(self, game):
+        super().__init__()
+        self.game = game  # 引用游戏实例以访问音效
+        self.width = PLAYER_SIZE
+        self.height = PLAYER_SIZE
+        self.color = BLUE
+
+        # 创建精灵图像和矩形
+        self.image = pygame.Surface((self.width, self.height))
+        self.image.fill(self.color)
+        self.rect = self.image.get_rect()
+        self.reset()
+
+    def reset(self):
+        # 重新开始一局时复用同一个玩家对象
+        self.vel_x = 0
+        self.vel_y = 0
+        self.on_ground = False
+        self.prev_bottom = 0  # 本帧移动前的脚底位置（用于扫掠碰撞）
+        self.health = 100
+        self.level = 0  # 重命名为level，避免与精灵组图层冲突
+        self.jump_buffer = 0  # 缓冲的跳跃请求剩余帧数
+        self.air_ticks = 0  # 离开平台后经过的帧数
+        self.rect.x = SCREEN_WIDTH // 2
+        self.rect.y = SCREEN_HEIGHT // 2
+
+    def get_state(self):
+        return (self.rect.x, self.rect.y, self.vel_x, self.vel_y, self.on_ground, self.prev_bottom,
+                self.health, self.level, self.jump_buffer, self.air_ticks)
+
+    def set_state(self, state):
+        x, y, self.vel_x, self.vel_y, on_ground, prev_bottom, health, level, jump_buffer, air_ticks = state
+        self.rect.x = int(x)
+        self.rect.y = int(y)
+        self.on_ground = bool(on_ground)
+        self.prev_bottom = int(prev_bottom)
+        self.health = int(health)
+        self.level = int(level)
+        self.jump_buffer = int(jump_buffer)
+        self.air_ticks = int(air_ticks)
+
+    def update(self):
+        # 跳跃缓冲倒计时；on_ground 仍是上一帧的落地结果
+        if self.jump_buffer:
+            self.jump_buffer -= 1
+        self.air_ticks = 0 if self.on_ground else self.air_ticks + 1
+
+        # 应用重力
+        self.vel_y += GRAVITY
+        if self.vel_y > MAX_FALL_SPEED:
+            self.vel_y = MAX_FALL_SPEED
+
+        # 更新位置
+        self.prev_bottom = self.rect.bottom
+        self.rect.x += self.vel_x
+        self.rect.y += self.vel_y
+
+        # 边界检查
+        if self.rect.left < 0:
+            self.rect.left = 0
+        elif self.rect.right > SCREEN_WIDTH:
+            self.rect.right = SCREEN_WIDTH
+
+        # 检查是否在地面上
+        self.on_ground = False
+
+    def jump(self):
+        # 跳跃请求：不能立即起跳时缓冲 JUMP_BUFFER_TICKS 帧，落地后自动起跳
+        self.jump_buffer = JUMP_BUFFER_TICKS
+        self.try_jump()
+
+    def try_jump(self):
+        # 站在平台上，或刚离开平台（土狼时间，且不是在上升中）时起跳
+        if self.on_ground or (self.air_ticks <= COYOTE_TICKS and self.vel_y >= 0):
+            self.vel_y = JUMP_POWER
+            self.jump_buffer = 0
+            # 播放跳跃音效
+            self.game.play_sound('jump')
+
+    def move_left(self):
+        self.vel_x = -PLAYER_SPEED
+
+    def move_right(self):
+        self.vel_x = PLAYER_SPEED
+
+    def stop(self):
+        self.vel_x = 0
+
+    def check_collision(self, platforms):
+        # 只查询脚下扫过的行（扫掠检测，下落再快也不会穿过平台）
+        if self.vel_y <= 0:
+            return None
+
+        platform = platforms.find_landing(self.rect, self.prev_bottom)
+        if platform:
+            self.on_ground = True
+            self.vel_y = 0
+            self.rect.bottom = platform.rect.top
+        return platform
+
+
+# 平台图像集：每种平台类型共用一张预渲染图像，破碎平台另有一组碎裂动画帧
+class PlatformAtlas:
+    def __init__(self):
+        self.images = None
+        self.break_frames = None
+
+    def build(self):
+        # 首次绘制时才创建，无头模式不会分配任何 Surface
+        self.images = [self._create_image(get_platform_color(platform_type))
+                       for platform_type in range(PLATFORM_BOUNCY + 1)]
+        self.images.append(self._create_image(GRAY))  # 未知类型
+
+        # 碎裂动画：颜色变亮（原先的闪烁效果）、裂纹逐渐增多并逐渐透明
+        self.break_frames = []
+        for i in range(BREAK_FRAMES):
+            image = self._create_image((255, 100, 100))
+            for j in range(i + 1):
+                crack_x = (j + 1) * PLATFORM_WIDTH // (i + 2)
+                pygame.draw.line(image, BLACK, (crack_x, 0), (crack_x - 4, PLATFORM_HEIGHT), 2)
+            image.set_alpha(255 - i * 160 // BREAK_FRAMES)
+            self.break_frames.append(image)
+
+    def _create_image(self, color):
+        image = pygame.Surface((PLATFORM_WIDTH, PLATFORM_HEIGHT))
+        image.fill(color)
+        if pygame.display.get_surface():
+            image = image.convert()
+        return image
+
+    def get_image(self, platform_type, break_timer):
+        if self.images is None:
+            self.build()
+        if platform_type == PLATFORM_BREAKING and break_timer > 0:
+            return self.break_frames[(FPS - break_timer) * BREAK_FRAMES // FPS]
+        if 0 <= platform_type <= PLATFORM_BOUNCY:
+            return self.images[platform_type]
+        return self.images[-1]
+
+
+PLATFORM_ATLAS = PlatformAtlas()
+
+
+def get_platform_color(platform_type):
+    if platform_type == PLATFORM_NORMAL:
+        return GREEN
+    elif platform_type == PLATFORM_MOVING:
+        return BLUE
+    elif platform_type == PLATFORM_BREAKING:
+        return RED
+    elif platform_type == PLATFORM_BOUNCY:
+        return YELLOW
+    return GRAY
+
+
+# 平台类（紧凑的 __slots__ 布局，图像取自共享的 PLATFORM_ATLAS）
+class Platform:
+    __slots__ = ('rect', 'type', 'move_direction', 'break_timer', 'serial', 'row')
+
+    STATE_SIZE = 6
+
+    width = PLATFORM_WIDTH
+    height = PLATFORM_HEIGHT
+    move_speed = 2
+
+    def __init__(self, x, y, platform_type=PLATFORM_NORMAL):
+        self.rect = pygame.Rect(x, y, PLATFORM_WIDTH, PLATFORM_HEIGHT)
+        self.serial = 0  # 加入 PlatformGrid 的顺序
+        self.row = 0  # 在 PlatformGrid 中所在的行
+        self.reset(x, y, platform_type)
+
+    def reset(self, x, y, platform_type=PLATFORM_NORMAL):
+        # 对象池复用时重新初始化
+        self.rect.x = x
+        self.rect.y = y
+        self.type = platform_type
+        self.move_direction = 1  # 1 向右，-1 向左
+        self.break_timer = 0
+
+    def get_state(self):
+        return (self.rect.x, self.rect.y, self.type, self.move_direction, self.break_timer, self.serial)
+
+    def set_state(self, state):
+        # 位置和类型由 PlatformPool.acquire 设置，serial 需在加入 PlatformGrid 之后恢复
+        self.move_direction = int(state[3])
+        self.break_timer = int(state[4])
+
+    @property
+    def image(self):
+        return PLATFORM_ATLAS.get_image(self.type, self.break_timer)
+
+    def get_color(self):
+        return get_platform_color(self.type)
+
+    def update(self):
+        # 移动平台
+        if self.type == PLATFORM_MOVING:
+            self.rect.x += self.move_direction * self.move_speed
+            if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
+                self.move_direction *= -1
+
+        # 破碎平台
+        if self.type == PLATFORM_BREAKING and self.break_timer > 0:
+            self.break_timer -= 1
+            # 1秒后平台完全消失
+            if self.break_timer == 0:
+                return True  # 平台消失
+
+        return False
+
+    def on_collision(self):
+        if self.type == PLATFORM_BREAKING:
+            self.break_timer = FPS  # 设置为FPS值，即1秒后消失
+        elif self.type == PLATFORM_BOUNCY:
+            return True  # 弹力平台
+        return False
+
+
+# 平台对象池：回收被移除的平台，避免每次生成都分配新对象
+class PlatformPool:
+    def __init__(self):
+        self.free = []
+
+    def acquire(self, x, y, platform_type):
+        if self.free:
+            platform = self.free.pop()
+            platform.reset(x, y, platform_type)
+            return platform
+        return Platform(x, y, platform_type)
+
+    def release(self, platform):
+        self.free.append(platform)
+
+
+def draw_spikes(surface):
+    # 绘制尖刺天花板
+    for i in range(SCREEN_WIDTH // 20 + 1):
+        pygame.draw.polygon(surface, RED, [(i * 20, 0), (i * 20 + 10, SPIKE_HEIGHT), (i * 20 + 20, 0)])
+
+
+def create_spikes_surface():
+    # 预渲染的尖刺天花板图层（透明背景）
+    surface = pygame.Surface((SCREEN_WIDTH, SPIKE_HEIGHT + 1), pygame.SRCALPHA)
+    draw_spikes(surface)
+    return surface
+
+
+# 游戏类
+class Game:
+    def __init__(self, assets=None, seed=None, pool=None, profiler=None, level_thread=False):
+        # assets 为 None 时为无头模式：不需要窗口、混音器和字体，只能 step 不能 draw
+        self.assets = assets
+        # 平台来自预先生成并检查过可达性的关卡流；level_thread 为 True 时在后台线程中生成
+        self.level_thread = level_thread
+        self.next_level = None  # prepare_restart 预先准备的下一局 (种子, 关卡流)
+        self.player = Player(self)  # 传递游戏实例到玩家
+        self.pool = pool or PlatformPool()
+        self.platforms = PlatformGrid()
+        self._removed_platforms = []  # 每帧复用，避免分配新列表
+        self.font = assets.font if assets else None
+        self.profiler = profiler  # 可选的 FrameProfiler，记录 update 各阶段耗时
+
+        # 预渲染静态UI元素（优化渲染性能）
+        if self.font:
+            self.paused_surface = self._create_paused_surface()
+            self.game_over_surface = self._create_game_over_surface()
+            self.spikes_surface = create_spikes_surface()
+            self.hud = self._create_hud()
+            self.particles = self._create_particles()
+        else:
+            self.paused_surface = None
+            self.game_over_surface = None
+            self.spikes_surface = None
+            self.hud = []
+            self.particles = None  # 无头模式不模拟粒子
+
+        self.reset(seed)
+
+    def reset(self, seed=None, level_stream=None):
+        # 重置一局的状态；玩家、平台索引、HUD 和预渲染画面都原地复用
+        # 每局独立的随机数生成器，给定 seed 和输入序列时结果可复现
+        # 未指定时随机选一个，保证每局都有可记录的种子
+        if seed is None:
+            seed = random.randrange(SEED_RANGE)
+        self.seed = seed
+        self.level_stream = level_stream or self._create_level_stream(seed)
+        self.distance = 0.0  # 平台累计滚动的距离
+        self.player.reset()
+        self.platform_speed = PLATFORM_SPEED
+        self.score = 0
+        self.game_over = False
+        self.paused = False
+        self.music_playing = False
+        if self.particles:
+            self.particles.clear()
+
+        self.create_initial_platforms()
+
+    def _create_level_stream(self, seed):
+        from level_gen import LevelStream
+
+        return LevelStream(seed, threaded=self.level_thread)
+
+    def _create_particles(self):
+        from particles import ParticleSystem
+
+        return ParticleSystem()
+
+    def create_initial_platforms(self):
+        # 关卡流的第一个平台是起始弹簧平台，将玩家位置设置为起始平台上方
+        self.next_platform = self.level_stream.next()
+        start_platform_x = self.next_platform[0]
+        self.player.rect.x = start_platform_x + PLATFORM_WIDTH // 2 - PLAYER_SIZE // 2
+        self.player.rect.y = START_PLATFORM_Y - PLAYER_SIZE
+        self.player.on_ground = True
+        self.player.vel_y = 0
+
+        # 加入起始平台以及已经在画面中的平台
+        self.spawn_platforms()
+
+    def spawn_platforms(self):
+        # 关卡流中的下一个平台滚动到屏幕上方时加入（平台数达到上限时推迟）
+        platform = self.next_platform
+        while platform[1] - self.distance <= START_PLATFORM_Y - SPAWN_Y and len(self.platforms) < MAX_PLATFORMS:
+            x, altitude, platform_type = platform
+            y = round(START_PLATFORM_Y - altitude + self.distance)
+            self.platforms.add(self.pool.acquire(x, y, platform_type))
+            platform = self.level_stream.next()
+        self.next_platform = platform
+
+    def get_state(self):
+        # 打包本局的全部可变状态（不含 Surface、字体等资源），可用 set_state 恢复
+        state = array('d', (self.platform_speed, self.score, self.game_over, self.paused, self.distance,
+                            self.level_stream.position, self.platforms.next_serial))
+        state.extend(self.player.get_state())
+        for platform in self.platforms:
+            state.extend(platform.get_state())
+        return state
+
+    def set_state(self, state):
+        self.platform_speed = state[0]
+        self.score = int(state[1])
+        self.game_over = bool(state[2])
+        self.paused = bool(state[3])
+        self.distance = state[4]
+        # next_platform 是已从关卡流取出但尚未加入的平台
+        self.level_stream.seek(int(state[5]) - 1)
+        self.next_platform = self.level_stream.next()
+        self.player.set_state(state[GAME_STATE_SIZE:GAME_STATE_SIZE + Player.STATE_SIZE])
+
+        for platform in self.platforms:
+            self.pool.release(platform)
+        self.platforms.clear()
+        size = Platform.STATE_SIZE
+        for i in range(GAME_STATE_SIZE + Player.STATE_SIZE, len(state), size):
+            values = state[i:i + size]
+            platform = self.pool.acquire(int(values[0]), int(values[1]), int(values[2]))
+            platform.set_state(values)
+            self.platforms.add(platform)
+            platform.serial = int(values[5])
+        self.platforms.next_serial = int(state[6])
+
+    def upcoming_platforms(self, count):
+        # 接下来将依次加入的 count 个平台 (x, 高度, 类型)，不影响关卡流
+        return [self.next_platform] + self.level_stream.peek(count - 1)
+
+    def play_sound(self, name):
+        # 无头模式下静音
+        if self.assets:
+            self.assets.play_sound(name)
+
+    def emit_particles(self, effect, x, y, width=0, height=0):
+        # 粒子效果（见 particles.EFFECTS），无头模式下忽略
+        if self.particles:
+            self.particles.emit(effect, x, y, width, height)
+
+    def step(self, inputs=0):
+        # 推进一帧：先应用本帧输入（INPUT_* 位组合），再更新游戏状态
+        if inputs & INPUT_JUMP:
+            self.player.jump()
+        elif self.player.jump_buffer:
+            self.player.try_jump()
+        if inputs & INPUT_PAUSE:
+            self.toggle_pause()
+
+        if not self.paused:
+            if inputs & INPUT_LEFT:
+                self.player.move_left()
+            elif inputs & INPUT_RIGHT:
+                self.player.move_right()
+            else:
+                self.player.stop()
+
+        self.update()
+        # 粒子只是画面效果：暂停时静止，游戏结束后仍继续飞散
+        if self.particles and not self.paused:
+            self.particles.update()
+
+    def update(self):
+        if self.game_over or self.paused:
+            return
+
+        # 启动背景音乐（如果可用且未播放）
+        if self.assets and self.assets.use_background_music and not self.music_playing:
+            self.assets.play_music()
+            self.music_playing = True
+
+        profiler = self.profiler
+
+        # 更新玩家
+        self.player.update()
+        if profiler:
+            profiler.mark(PHASE_PLAYER)
+
+        # 检查平台碰撞
+        platform = self.player.check_collision(self.platforms)
+        if platform:
+            if platform.on_collision():
+                self.player.vel_y = JUMP_POWER * 1.5  # 弹力平台跳得更高
+                # 播放弹跳音效
+                self.play_sound('bounce')
+                self.emit_particles('bounce', self.player.rect.x, self.player.rect.bottom, PLAYER_SIZE)
+            elif platform.type == PLATFORM_BREAKING:
+                # 播放破碎音效
+                self.play_sound('break')
+
+            # 更新层数
+            if platform.rect.y < SCREEN_HEIGHT // 2 and platform.rect.y > self.player.rect.y:
+                self.player.level += 1  # 修改为level
+                self.score += 10
+        if profiler:
+            profiler.mark(PHASE_COLLISION)
+
+        # 更新平台并移除需要消失的平台
+        removed = self._removed_platforms
+        self.distance += self.platform_speed
+        for platform in self.platforms:
+            platform.rect.y += self.platform_speed
+            # 破碎完成或离开屏幕的平台
+            if platform.update():
+                removed.append(platform)
+                self.emit_particles('break', platform.rect.x, platform.rect.y, PLATFORM_WIDTH, PLATFORM_HEIGHT)
+            elif platform.rect.top > SCREEN_HEIGHT:
+                removed.append(platform)
+            else:
+                self.platforms.move(platform)
+
+        for platform in removed:
+            self.platforms.remove(platform)
+            self.pool.release(platform)
+        removed.clear()
+        if profiler:
+            profiler.mark(PHASE_PLATFORMS)
+
+        # 生成新平台
+        self.spawn_platforms()
+        if profiler:
+            profiler.mark(PHASE_SPAWN)
+
+        # 增加难度（限制平台速度上限）
+        if self.score % 100 == 0 and self.score > 0 and self.platform_speed < MAX_PLATFORM_SPEED:
+            self.platform_speed += 0.1
+
+        # 检查游戏结束条件
+        if self.player.rect.y > SCREEN_HEIGHT or self.player.rect.y < -50 or self.player.health <= 0:
+            self.game_over = True
+            # 播放游戏结束音效
+            self.play_sound('game_over')
+            # 从玩家所在位置（掉出屏幕时为屏幕边缘）炸开
+            self.emit_particles('game_over', self.player.rect.x,
+                                min(max(self.player.rect.y, 0), SCREEN_HEIGHT - PLAYER_SIZE), PLAYER_SIZE, PLAYER_SIZE)
+            # 停止背景音乐
+            if self.assets and self.assets.use_background_music:
+                self.assets.stop_music()
+                self.music_playing = False
+
+        # 尖刺天花板
+        if self.player.rect.y < 0:
+            self.player.health -= 10
+            self.player.vel_y = 5
+            self.emit_particles('spike', self.player.rect.x, 0, PLAYER_SIZE, SPIKE_HEIGHT)
+        if profiler:
+            profiler.mark(PHASE_RULES)
+
+    def draw(self, surface, interpolation=None):
+        # surface: 屏幕 Surface 或 render.TextureCanvas（只用到 fill / blit / blits）
+        # interpolation: 可选的 timestep.Interpolation，按插值后的位置绘制精灵
+        assets = self.assets
+        if assets.use_background_image:
+            surface.blit(assets.background_image, (0, 0))
+        else:
+            surface.fill(BLACK)
+
+        # 绘制所有精灵（优化渲染）
+        if interpolation:
+            surface.blits([(sprite.image, interpolation.rect(sprite)) for sprite in self.sprites()], False)
+        else:
+            surface.blits([(sprite.image, sprite.rect) for sprite in self.sprites()], False)
+
+        # 绘制UI
+        self.update_hud()
+        for widget in self.hud:
+            widget.draw(surface)
+
+        # 绘制暂停提示（使用预渲染的surface）
+        if self.paused:
+            surface.blit(self.paused_surface, (0, 0))
+
+        # 绘制尖刺天花板（使用预渲染的surface）
+        surface.blit(self.spikes_surface, (0, 0))
+
+        # 游戏结束画面（使用预渲染的surface）
+        if self.game_over:
+            surface.blit(self.game_over_surface, (0, 0))
+            final_score_text = self.assets.text_cache.render(self.font, f"最终分数: {self.score}", WHITE)
+            surface.blit(final_score_text, (SCREEN_WIDTH // 2 - final_score_text.get_width() // 2, SCREEN_HEIGHT // 2))
+
+        # 粒子画在最上层
+        if self.particles:
+            self.particles.draw(surface)
+
+    def sprites(self):
+        # 绘制顺序：先玩家后平台
+        yield self.player
+        yield from self.platforms
+
+    def _create_hud(self):
+        cache = self.assets.text_cache
+        hud = [HudText(cache, self.font, template, position, WHITE) for template, position in HUD_LAYOUT]
+
+        # 显示音频状态（运行中不会变化，创建时渲染一次）
+        assets = self.assets
+        if assets.mixer_initialized:
+            sound_text = HudText(cache, self.font, "音效: {}", (10, 130), WHITE)
+            sound_text.set("开启" if assets.use_sound_effects else "关闭")
+            music_text = HudText(cache, self.font, "音乐: {}", (10, 160), WHITE)
+            music_text.set("开启" if assets.use_background_music else "关闭")
+            hud += [sound_text, music_text]
+        return hud
+
+    def update_hud(self):
+        # 只有数值变化的控件会重新渲染
+        values = (self.player.health, self.player.level, self.platform_speed, self.score)
+        for widget, value in zip(self.hud, values):
+            widget.set(value)
+
+    def _create_paused_surface(self):
+        surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        surf.fill((0, 0, 0, 180))
+
+        paused_text = self.font.render("游戏暂停", True, WHITE)
+        continue_text = self.font.render("按 P 键继续", True, WHITE)
+
+        surf.blit(paused_text, (SCREEN_WIDTH // 2 - paused_text.get_width() // 2, SCREEN_HEIGHT // 2 - 25))
+        surf.blit(continue_text, (SCREEN_WIDTH // 2 - continue_text.get_width() // 2, SCREEN_HEIGHT // 2 + 25))
+
+        return surf
+
+    def _create_game_over_surface(self):
+        surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        surf.fill((0, 0, 0, 180))
+
+        over_text = self.font.render("游戏结束!", True, WHITE)
+        restart_text = self.font.render("按 R 键重新开始", True, WHITE)
+        exit_text = self.font.render("按 Q 键退出游戏", True, WHITE)
+
+        surf.blit(over_text, (SCREEN_WIDTH // 2 - over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
+        surf.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 2 + 50))
+        surf.blit(exit_text, (SCREEN_WIDTH // 2 - exit_text.get_width() // 2, SCREEN_HEIGHT // 2 + 80))
+
+        return surf
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        # 暂停/恢复背景音乐
+        if self.assets and self.assets.use_background_music:
+            if self.paused:
+                self.assets.pause_music()
+            else:
+                self.assets.unpause_music()
+
+    def prepare_restart(self, seed=None):
+        # 提前生成下一局的初始关卡（例如在游戏结束画面期间调用），restart 时直接使用
+        if self.next_level is None:
+            if seed is None:
+                seed = random.randrange(SEED_RANGE)
+            self.next_level = (seed, self._create_level_stream(seed))
+
+    def restart(self, seed=None):
+        # 原地重置，不重建玩家、预渲染画面和 HUD；当前平台回收到对象池供新一局复用
+        for platform in self.platforms:
+            self.pool.release(platform)
+        self.platforms.clear()
+        self.level_stream.close()
+
+        next_level = self.next_level
+        self.next_level = None
+        if next_level and seed in (None, next_level[0]):
+            self.reset(*next_level)
+        else:
+            if next_level:
+                next_level[1].close()
+            self.reset(seed)
@@ -0,0 +1,236 @@
+import itertools
+import math
+import queue
+import random
+import threading
+from collections import deque
+
+from game import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_SPEED, PLATFORM_WIDTH,
+    GRAVITY, JUMP_POWER, MAX_FALL_SPEED,
+    PLATFORM_NORMAL, PLATFORM_MOVING, PLATFORM_BREAKING, PLATFORM_BOUNCY,
+)
+
+# 关卡生成：按段（chunk）预先生成平台，每段都检查从上一段能否一路跳上来，
+# 生成结果放入缓冲区，游戏每帧只需从缓冲区取出即将进入画面的平台
+# 平台位置用"高度"表示：起始平台高度为 0，越往上越大
+
+CHUNK_PLATFORMS = 5  # 每段平台数
+MIN_GAP = 40  # 相邻平台的最小/最大高度差
+MAX_GAP = 80
+EASY_PLATFORMS = 3  # 起始平台之后的前几个平台为普通平台，降低初始难度
+MAX_ATTEMPTS = 20  # 随机布局未通过检查时的重试次数，之后改用逐个保证可达的布局
+BUFFER_CHUNKS = 4  # 预先生成的段数
+HISTORY_PLATFORMS = 256  # 保留最近取出的平台数，用于 seek 回退（倒带）
+MAX_DROP = SCREEN_HEIGHT  # 可达性检查考虑的最大下落高度
+# 平台类型权重（普通、移动、破碎、弹簧）；None 为等概率
+PLATFORM_TYPE_WEIGHTS = None
+PLATFORM_TYPES = (PLATFORM_NORMAL, PLATFORM_MOVING, PLATFORM_BREAKING, PLATFORM_BOUNCY)
+
+
+def lround(value):
+    # 与 pygame.Rect 赋值浮点数时的取整方式一致（四舍五入，.5 远离零）
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+def jump_arc(jump_power=JUMP_POWER, gravity=GRAVITY):
+    # 逐帧模拟一次起跳（与 Player.update 相同的积分与取整），返回每帧结束时相对起跳点的高度
+    heights = []
+    y = 0
+    vel = jump_power
+    while y < MAX_DROP:
+        vel = min(vel + gravity, MAX_FALL_SPEED)
+        y = lround(y + vel)
+        heights.append(-y)
+    return heights
+
+
+JUMP_ARC = jump_arc()
+
+
+def horizontal_reach(rise, arc=None, speed=PLAYER_SPEED):
+    # 落到高 rise 处的平台之前最多能横向移动的距离；跳不到该高度时返回 -1
+    # （平台在空中时向下滚动只会让目标更近，这里不计入，结果偏保守）
+    # arc 默认在调用时取模块的 JUMP_ARC，调参工具修改跳跃参数后会重新计算它
+    if arc is None:
+        arc = JUMP_ARC
+    frames = 0
+    for t, height in enumerate(arc):
+        if height >= rise:
+            frames = t + 1
+        elif frames:
+            break
+    if not frames:
+        return -1
+    return frames * speed
+
+
+def can_reach(source, target):
+    # source/target 为 (x, 高度, 类型)；横向距离按两个平台边缘之间的空隙计算，
+    # 不计玩家自身宽度，留出余量
+    gap = max(0, abs(target[0] - source[0]) - PLATFORM_WIDTH)
+    return horizontal_reach(target[1] - source[1]) >= gap
+
+
+class LevelGenerator:
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.altitude = 0  # 已生成的最高平台高度
+        self.entry = []  # 上一段中可到达的平台，作为下一段的起点
+        self.count = 0  # 已生成的平台数
+        self.rejected = 0  # 未通过可达性检查而重新生成的次数
+
+    def next_chunk(self):
+        # 第一段以起始弹簧平台开头（与玩家出生位置对应）
+        chunk = []
+        if not self.entry:
+            start = (SCREEN_WIDTH // 2 - PLATFORM_WIDTH // 2, 0, PLATFORM_BOUNCY)
+            chunk.append(start)
+            self.entry = [start]
+            self.count += 1
+
+        for _ in range(MAX_ATTEMPTS):
+            platforms = self._random_layout()
+            reachable = self.reachable(self.entry, platforms)
+            if platforms[-1] in reachable:
+                break
+            self.rejected += 1
+        else:
+            platforms = self._guided_layout()
+            reachable = self.reachable(self.entry, platforms)
+
+        chunk.extend(platforms)
+        self.entry = reachable
+        self.altitude = platforms[-1][1]
+        self.count += len(platforms)
+        return chunk
+
+    def _random_layout(self):
+        platforms = []
+        altitude = self.altitude
+        for i in range(CHUNK_PLATFORMS):
+            altitude += self.random.randint(MIN_GAP, MAX_GAP)
+            x = self.random.randint(0, SCREEN_WIDTH - PLATFORM_WIDTH)
+            platforms.append((x, altitude, self._platform_type(self.count + i)))
+        return platforms
+
+    def _guided_layout(self):
+        # 每个平台都放在上一个平台的可达范围内，保证通过检查
+        platforms = []
+        source = max(self.entry, key=lambda p: p[1])
+        altitude = self.altitude
+        for i in range(CHUNK_PLATFORMS):
+            altitude += self.random.randint(MIN_GAP, MAX_GAP)
+            reach = max(0, horizontal_reach(altitude - source[1])) + PLATFORM_WIDTH
+            x = self.random.randint(max(0, source[0] - reach),
+                                    min(SCREEN_WIDTH - PLATFORM_WIDTH, source[0] + reach))
+            # 链路上不放移动平台
+            platform_type = self._platform_type(self.count + i)
+            if platform_type == PLATFORM_MOVING:
+                platform_type = PLATFORM_NORMAL
+            source = (x, altitude, platform_type)
+            platforms.append(source)
+        return platforms
+
+    def _platform_type(self, index):
+        if index <= EASY_PLATFORMS:
+            return PLATFORM_NORMAL
+        if PLATFORM_TYPE_WEIGHTS is None:
+            return self.random.randint(0, 3)
+        return self.random.choices(PLATFORM_TYPES, PLATFORM_TYPE_WEIGHTS)[0]
+
+    def reachable(self, entry, platforms):
+        # 从 entry 出发能到达的平台；可以跳上更高的平台，也可以落到更低的平台，
+        # 所以反复检查直到不再有新的平台。移动平台的位置随时间变化，不作为可靠的落脚点
+        sources = list(entry)
+        found = []
+        changed = True
+        while changed:
+            changed = False
+            for platform in platforms:
+                if platform[2] == PLATFORM_MOVING or platform in found:
+                    continue
+                if any(can_reach(source, platform) for source in sources):
+                    sources.append(platform)
+                    found.append(platform)
+                    changed = True
+        return found
+
+
+class LevelStream:
+    # 按顺序提供平台 (x, 高度, 类型)；threaded 为 True 时在后台线程中生成
+    def __init__(self, seed, buffer_chunks=BUFFER_CHUNKS, threaded=False):
+        self.generator = LevelGenerator(seed)
+        self.pending = deque()  # 当前段中尚未取出的平台
+        self.history = deque(maxlen=HISTORY_PLATFORMS)  # 最近取出的平台
+        self.position = 0  # 已取出的平台数
+        self.queue = None
+        self.stopped = False
+        if threaded:
+            self.queue = queue.Queue(buffer_chunks)
+            self.thread = threading.Thread(target=self._worker, daemon=True)
+            self.thread.start()
+        else:
+            self.buffer = deque(self.generator.next_chunk() for _ in range(buffer_chunks))
+
+    def _worker(self):
+        while not self.stopped:
+            chunk = self.generator.next_chunk()
+            while not self.stopped:
+                try:
+                    self.queue.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def _fill(self):
+        # 把下一段平台移入 pending
+        if self.queue is not None:
+            self.pending.extend(self.queue.get())
+        else:
+            self.pending.extend(self.buffer.popleft())
+            self.buffer.append(self.generator.next_chunk())
+
+    def next(self):
+        if not self.pending:
+            self._fill()
+        platform = self.pending.popleft()
+        self.history.append(platform)
+        self.position += 1
+        return platform
+
+    def peek(self, count):
+        # 返回接下来的 count 个平台，但不取出
+        while len(self.pending) < count:
+            self._fill()
+        return list(itertools.islice(self.pending, count))
+
+    def seek(self, position):
+        # 定位到取出了 position 个平台时的位置：向前直接取出平台；
+        # 向后只能回退到最近 HISTORY_PLATFORMS 个平台以内
+        back = self.position - position
+        if back < 0:
+            for _ in range(-back):
+                self.next()
+            return
+        if back > len(self.history):
+            raise ValueError(f"无法定位到第 {position} 个平台（当前 {self.position}）")
+        for _ in range(back):
+            self.pending.appendleft(self.history.pop())
+        self.position = position
+
+    def close(self):
+        # 结束后台线程（重新开始一局时调用）
+        self.stopped = True
+
+
+END_PLATFORM = (0, math.inf, PLATFORM_NORMAL)  # PlatformList 用完后返回，永远不会进入画面
+
+
+class PlatformList:
+    # 只按给定顺序提供平台的关卡流，用于从快照推演（见 BatchGame.from_state），用完后不再生成平台
+    def __init__(self, platforms):
+        self.platforms = iter(platforms)
+
+    def next(self):
+        return next(self.platforms, END_PLATFORM)
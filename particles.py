@@ -0,0 +1,110 @@
+import numpy as np
+import pygame
+
+from game import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# 粒子系统：所有粒子存放在预先分配的 NumPy 数组中（环形缓冲区，新粒子覆盖最早的槽位），
+# 每帧用向量运算更新；绘制时把存活粒子一次性写入一张透明图层（surfarray），再整体贴到目标上。
+# 粒子只影响画面，不属于游戏状态（不进入 get_state，也不影响模拟结果）
+
+MAX_PARTICLES = 4096
+PARTICLE_SIZE = 2  # 每个粒子绘制为边长这么多像素的方块
+PARTICLE_GRAVITY = 0.2
+PARTICLE_DRAG = 0.97  # 每帧速度保留的比例
+
+# 效果：(粒子数, 最大初速度, 寿命帧数, 发射方向范围（弧度，0 为向右，-pi/2 为向上）, 颜色列表)
+EFFECTS = {
+    'break': (48, 2.5, 40, (0.0, np.pi), [(255, 100, 100), (200, 60, 60), (120, 40, 40)]),
+    'bounce': (24, 4.0, 24, (-np.pi, 0.0), [(255, 255, 0), (255, 220, 120), (255, 255, 255)]),
+    'spike': (32, 3.5, 30, (0.0, np.pi), [(255, 0, 0), (255, 160, 160), (255, 255, 255)]),
+    'game_over': (400, 7.0, 90, (-np.pi, np.pi), [(0, 0, 255), (100, 150, 255), (255, 255, 255)]),
+}
+
+
+class ParticleSystem:
+    def __init__(self, capacity=MAX_PARTICLES):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vel_x = np.zeros(capacity, dtype=np.float32)
+        self.vel_y = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int32)  # 剩余帧数，0 表示空槽
+        self.max_life = np.ones(capacity, dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.head = 0  # 下一个粒子写入的槽位
+        self.live = 0  # 存活粒子数
+        self.rng = np.random.default_rng()  # 与游戏的随机数生成器分开，不影响关卡和录像
+
+    def clear(self):
+        self.life[:] = 0
+        self.live = 0
+
+    def emit(self, effect, x, y, width=0, height=0):
+        # 在 (x, y) 起、宽高为 width x height 的区域内随机位置发射一组粒子
+        count, speed, life, (angle_low, angle_high), colors = EFFECTS[effect]
+        rng = self.rng
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+
+        angle = rng.uniform(angle_low, angle_high, count)
+        velocity = rng.uniform(0.3, 1.0, count) * speed
+        self.x[slots] = x + rng.uniform(0, width, count)
+        self.y[slots] = y + rng.uniform(0, height, count)
+        self.vel_x[slots] = np.cos(angle) * velocity
+        self.vel_y[slots] = np.sin(angle) * velocity
+        lifetimes = rng.integers(life // 2, life + 1, count)
+        self.live += count - np.count_nonzero(self.life[slots])
+        self.life[slots] = lifetimes
+        self.max_life[slots] = lifetimes
+        self.color[slots] = np.array(colors, dtype=np.uint8)[rng.integers(0, len(colors), count)]
+
+    def update(self):
+        # 每个模拟步调用一次；全部在原数组上运算，空槽一起计算但不会被绘制
+        if not self.live:
+            return
+        self.x += self.vel_x
+        self.y += self.vel_y
+        self.vel_x *= PARTICLE_DRAG
+        self.vel_y *= PARTICLE_DRAG
+        self.vel_y += PARTICLE_GRAVITY
+        self.life -= 1
+        np.maximum(self.life, 0, out=self.life)
+        self.live = int(np.count_nonzero(self.life))
+
+    def render(self):
+        # 把屏幕内的存活粒子画到一张新的透明图层上，返回 (图层, 所在矩形)；没有可见粒子时返回 None
+        if not self.live:
+            return None
+        px = self.x.astype(np.int32)
+        py = self.y.astype(np.int32)
+        visible = (self.life > 0) & (px >= 0) & (px <= SCREEN_WIDTH - PARTICLE_SIZE) & \
+                  (py >= 0) & (py <= SCREEN_HEIGHT - PARTICLE_SIZE)
+        index = np.flatnonzero(visible)
+        if not len(index):
+            return None
+
+        px = px[index]
+        py = py[index]
+        left, top = int(px.min()), int(py.min())
+        rect = pygame.Rect(left, top, int(px.max()) - left + PARTICLE_SIZE, int(py.max()) - top + PARTICLE_SIZE)
+        px -= left
+        py -= top
+        color = self.color[index]
+        # 随剩余寿命淡出
+        alpha = (self.life[index] * 255 // self.max_life[index]).astype(np.uint8)
+
+        # 每次使用新的图层（纹理后端按新图像上传），只覆盖粒子所在区域
+        layer = pygame.Surface(rect.size, pygame.SRCALPHA)
+        pixels = pygame.surfarray.pixels3d(layer)
+        pixels_alpha = pygame.surfarray.pixels_alpha(layer)
+        for dx in range(PARTICLE_SIZE):
+            for dy in range(PARTICLE_SIZE):
+                pixels[px + dx, py + dy] = color
+                pixels_alpha[px + dx, py + dy] = alpha
+        del pixels, pixels_alpha  # 解除对图层的锁定
+        return layer, rect
+
+    def draw(self, surface):
+        rendered = self.render()
+        if rendered:
+            surface.blit(*rendered)
@@ -0,0 +1,74 @@
+# 平台的纵向分桶索引：按 rect.y 分行存放，落地检测只查玩家脚下的一两行
+
+ROW_HEIGHT = 32  # 每行高度（像素），需大于单帧最大下落距离 + 落地容差，保证最多跨两行
+LANDING_TOLERANCE = 10  # 脚底低于平台顶部不超过该值仍视为落在平台上
+
+
+class PlatformGrid:
+    def __init__(self, row_height=ROW_HEIGHT):
+        self.row_height = row_height
+        self.sprites = []  # 按加入顺序保存全部平台
+        self.rows = {}  # 行号 -> 该行平台列表
+        self.next_serial = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def __iter__(self):
+        return iter(self.sprites)
+
+    def __contains__(self, platform):
+        return platform in self.rows.get(platform.row, ())
+
+    def add(self, platform):
+        # serial 记录加入顺序，用于同高度平台之间的先后判定
+        platform.serial = self.next_serial
+        self.next_serial += 1
+        platform.row = platform.rect.y // self.row_height
+        self.sprites.append(platform)
+        self._row(platform.row).append(platform)
+
+    def remove(self, platform):
+        self.sprites.remove(platform)
+        self._discard(platform)
+
+    def clear(self):
+        self.sprites.clear()
+        self.rows.clear()
+
+    def move(self, platform):
+        # 平台纵向移动后调用，只有跨行时才需要调整所在的桶
+        row = platform.rect.y // self.row_height
+        if row != platform.row:
+            self._discard(platform)
+            platform.row = row
+            self._row(row).append(platform)
+
+    def find_landing(self, rect, prev_bottom):
+        # 扫掠检测：本帧脚底从 prev_bottom 移动到 rect.bottom，
+        # 顶部位于 [prev_bottom - 容差, rect.bottom] 且水平重叠的平台中取最高的一个
+        low = prev_bottom - LANDING_TOLERANCE
+        high = rect.bottom
+        found = None
+        for row in range(low // self.row_height, high // self.row_height + 1):
+            for platform in self.rows.get(row, ()):
+                top = platform.rect.top
+                if (low <= top <= high and
+                        rect.right >= platform.rect.left and
+                        rect.left <= platform.rect.right):
+                    if (found is None or top < found.rect.top or
+                            (top == found.rect.top and platform.serial < found.serial)):
+                        found = platform
+        return found
+
+    def _row(self, row):
+        platforms = self.rows.get(row)
+        if platforms is None:
+            platforms = self.rows[row] = []
+        return platforms
+
+    def _discard(self, platform):
+        platforms = self.rows[platform.row]
+        platforms.remove(platform)
+        if not platforms:
+            del self.rows[platform.row]
@@ -0,0 +1,147 @@
+import csv
+import time
+from array import array
+
+import pygame
+
+# 分阶段帧耗时统计：每帧各阶段的耗时写入固定大小的环形缓冲区，
+# 可在游戏中显示 p50/p99 与帧耗时曲线，也可导出为 CSV
+
+PHASE_EVENTS = 0  # 事件处理
+PHASE_INPUT = 1  # 按键轮询
+PHASE_PLAYER = 2  # 玩家更新
+PHASE_COLLISION = 3  # 碰撞检测
+PHASE_PLATFORMS = 4  # 平台滚动与回收
+PHASE_SPAWN = 5  # 生成新平台
+PHASE_RULES = 6  # 难度与结束判定
+PHASE_DRAW = 7  # 绘制
+PHASE_FLIP = 8  # display.flip / display.update
+PHASE_TICK = 9  # clock.tick 等待
+PHASE_AUTOPILOT = 10  # 自动驾驶搜索
+PHASE_REWIND = 11  # 倒带快照记录与还原
+PHASE_NET = 12  # 观战广播（取状态并交给服务器线程）
+
+PHASE_NAMES = ('events', 'input', 'player', 'collision', 'platforms', 'spawn', 'rules', 'draw', 'flip', 'tick',
+               'autopilot', 'rewind', 'net')
+
+STATS_INTERVAL = 30  # 每隔多少帧重新计算一次百分位数
+GRAPH_FRAMES = 120  # 曲线显示的帧数
+FRAME_BUDGET_MS = 1000 / 60
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class FrameProfiler:
+    def __init__(self, size=600):
+        self.size = size
+        self.samples = [array('d', bytes(8 * size)) for _ in PHASE_NAMES]  # 单位：秒
+        self.totals = array('d', bytes(8 * size))
+        self.index = 0  # 下一帧写入的位置
+        self.count = 0
+        self.current = [0.0] * len(PHASE_NAMES)
+        self.frame_start = 0.0
+        self.last = 0.0
+        self.visible = False
+        self.stats = []
+        self.extra_stats = []  # 额外显示在面板中的 (名称, 返回 (p50, p99) 毫秒的函数)，如输入延迟
+        self.font = None
+        self.panel = None
+
+    def start_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        # 把上一次标记到现在的时间计入 phase
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        index = self.index
+        current = self.current
+        for phase, value in enumerate(current):
+            self.samples[phase][index] = value
+            current[phase] = 0.0
+        self.totals[index] = self.last - self.frame_start
+        self.index = (index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        if self.visible and self.count and self.index % STATS_INTERVAL == 0:
+            self.stats = self.compute_stats()
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.stats = self.compute_stats()
+
+    def compute_stats(self):
+        # 各阶段及整帧的 (名称, p50 毫秒, p99 毫秒)
+        stats = []
+        for name, values in zip(PHASE_NAMES + ('frame',), self.samples + [self.totals]):
+            ordered = sorted(values[:self.count])
+            stats.append((name, percentile(ordered, 0.5) * 1000, percentile(ordered, 0.99) * 1000))
+        for name, source in self.extra_stats:
+            stats.append((name, *source()))
+        return stats
+
+    def add_stat(self, name, source):
+        self.extra_stats.append((name, source))
+
+    def frames(self):
+        # 按时间顺序返回缓冲区中的帧编号
+        start = (self.index - self.count) % self.size
+        return [(start + i) % self.size for i in range(self.count)]
+
+    def dump_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + [f'{name}_ms' for name in PHASE_NAMES] + ['total_ms'])
+            for n, i in enumerate(self.frames()):
+                writer.writerow([n] + [f'{values[i] * 1000:.4f}' for values in self.samples] +
+                                [f'{self.totals[i] * 1000:.4f}'])
+        return path
+
+    def draw_overlay(self, surface):
+        # 不透明面板，每帧完整覆盖自身区域；返回需要更新的矩形。
+        # 面板先画在单独的 Surface 上再贴到目标上，目标也可以是 render.TextureCanvas
+        if self.font is None:
+            self.font = pygame.font.Font(None, 16)
+            line_height = self.font.get_linesize()
+            self.panel = pygame.Rect(surface.get_width() - 190, 190, 185,
+                                     line_height * (len(PHASE_NAMES) + len(self.extra_stats) + 2) + 60)
+
+        panel = self.panel
+        # 每帧使用新的 Surface，纹理后端会把它当作新图像上传
+        image = pygame.Surface(panel.size)
+        image.fill((20, 20, 20))
+        line_height = self.font.get_linesize()
+        y = 4
+        self._draw_row(image, y, ("phase", "p50 ms", "p99 ms"), (255, 255, 0))
+        for name, p50, p99 in self.stats:
+            y += line_height
+            self._draw_row(image, y, (name, f"{p50:.2f}", f"{p99:.2f}"), (220, 220, 220))
+
+        # 帧耗时曲线：每帧一根竖线，红线为 60 FPS 的帧预算
+        graph = pygame.Rect(4, panel.height - 54, panel.width - 8, 50)
+        scale = graph.height / (FRAME_BUDGET_MS * 2)
+        frames = self.frames()[-GRAPH_FRAMES:]
+        for n, i in enumerate(frames):
+            height = min(graph.height, int(self.totals[i] * 1000 * scale))
+            x = graph.x + n * graph.width // GRAPH_FRAMES
+            color = (0, 200, 0) if self.totals[i] * 1000 <= FRAME_BUDGET_MS else (255, 80, 80)
+            pygame.draw.line(image, color, (x, graph.bottom), (x, graph.bottom - height))
+        budget_y = graph.bottom - int(FRAME_BUDGET_MS * scale)
+        pygame.draw.line(image, (255, 0, 0), (graph.x, budget_y), (graph.right, budget_y))
+        surface.blit(image, panel)
+        return panel
+
+    def _draw_row(self, image, y, columns, color):
+        # 第一列左对齐，数值列右对齐（面板内坐标）
+        name, *values = columns
+        image.blit(self.font.render(name, True, color), (4, y))
+        for i, value in enumerate(values):
+            text = self.font.render(value, True, color)
+            image.blit(text, (120 + i * 60 - text.get_width(), y))
@@ -0,0 +1,212 @@
+import weakref
+
+import pygame
+
+from game import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, create_spikes_surface
+
+# 两种渲染后端：
+#   DirtyRenderer  软件 Surface 上的脏矩形渲染：只重绘有变化的区域，并返回需要 display.update 的矩形列表
+#   TextureCanvas  pygame._sdl2.video 的 Renderer/Texture：图像首次绘制时上传为纹理，每帧完整重绘，
+#                  逻辑画布 400x600 按窗口大小缩放；没有硬件加速时使用 SDL 的软件渲染器
+# Game.draw 只使用两者共有的 fill / blit / blits，可以画到任意一种上
+
+
+class DirtyRenderer:
+    def __init__(self, surface, assets):
+        self.surface = surface
+        if assets.use_background_image:
+            self.background = assets.background_image
+        else:
+            self.background = pygame.Surface(surface.get_size())
+            self.background.fill(BLACK)
+
+        # 预渲染尖刺天花板图层，只在脏区域与其重叠时贴上
+        self.spikes = create_spikes_surface()
+        self.spikes_rect = self.spikes.get_rect()
+
+        self.sprite_state = {}  # 精灵 -> [上一帧矩形, 上一帧图像, 最后出现的帧号]
+        self.hud_state = {}  # HUD 控件 -> 上一帧绘制的 [文字图像, 矩形]
+        self.particle_rect = None  # 上一帧粒子图层覆盖的区域
+        self.frame = 0
+        self.mode = None
+        self.dirty = []
+
+    def invalidate(self):
+        # 下一帧完整重绘（切换场景后调用）
+        self.mode = None
+
+    def draw(self, game, overlays=(), interpolation=None):
+        # overlays: 绘制在最上层的 (图像, 位置) 列表，例如返回菜单提示
+        # interpolation: 可选的 timestep.Interpolation，精灵按插值后的位置绘制
+        self.frame += 1
+        drawn = self._layout(game, interpolation)
+        mode = (game.paused, game.game_over)
+        if mode != self.mode:
+            self.mode = mode
+            return self.draw_full(game, overlays, interpolation, drawn)
+
+        # 暂停和游戏结束画面是静止的，切换时已完整重绘；游戏结束后粒子仍在飞散时每帧完整重绘
+        if game.paused:
+            return []
+        if game.game_over:
+            if self.particle_rect or (game.particles and game.particles.live):
+                return self.draw_full(game, overlays, interpolation, drawn)
+            return []
+
+        dirty = self.dirty
+        dirty.clear()
+        self._collect_sprites(game, drawn, dirty)
+        self._collect_hud(game, dirty)
+        particles = self._collect_particles(game, dirty)
+        if not dirty:
+            return dirty
+
+        # 按 完整重绘 的图层顺序在每个脏区域内合成：背景、精灵、HUD、尖刺、粒子、覆盖层
+        surface = self.surface
+        for rect in dirty:
+            surface.set_clip(rect)
+            surface.blit(self.background, rect, rect)
+            for _, image, sprite_rect in drawn:
+                if sprite_rect.colliderect(rect):
+                    surface.blit(image, sprite_rect)
+            for widget in game.hud:
+                if widget.rect.colliderect(rect):
+                    widget.draw(surface)
+            if self.spikes_rect.colliderect(rect):
+                surface.blit(self.spikes, (0, 0))
+            if particles and particles[1].colliderect(rect):
+                surface.blit(*particles)
+            for overlay, position in overlays:
+                if overlay.get_rect(topleft=position).colliderect(rect):
+                    surface.blit(overlay, position)
+        surface.set_clip(None)
+        return dirty
+
+    def draw_full(self, game, overlays, interpolation, drawn):
+        game.draw(self.surface, interpolation)
+        for overlay, position in overlays:
+            self.surface.blit(overlay, position)
+
+        # 记录当前状态，之后只重绘变化部分
+        self.sprite_state.clear()
+        for sprite, image, rect in drawn:
+            self.sprite_state[sprite] = [rect.copy(), image, self.frame]
+        self.hud_state.clear()
+        for widget in game.hud:
+            self.hud_state[widget] = [widget.surface, widget.rect]
+        # 粒子由 game.draw 画出，位置未知，下一帧按整个屏幕擦除
+        self.particle_rect = self.surface.get_rect() if game.particles and game.particles.live else None
+        return [self.surface.get_rect()]
+
+    def _layout(self, game, interpolation):
+        # 本帧每个精灵的 (精灵, 图像, 绘制位置)
+        if interpolation:
+            return [(sprite, sprite.image, interpolation.rect(sprite)) for sprite in game.sprites()]
+        return [(sprite, sprite.image, sprite.rect) for sprite in game.sprites()]
+
+    def _collect_sprites(self, game, drawn, dirty):
+        # 移动过或换了图像的精灵：旧位置与新位置的并集需要重绘
+        frame = self.frame
+        for sprite, image, rect in drawn:
+            state = self.sprite_state.get(sprite)
+            if state is None:
+                self.sprite_state[sprite] = [rect.copy(), image, frame]
+                dirty.append(rect.copy())
+                continue
+            state[2] = frame
+            old_rect = state[0]
+            if old_rect != rect or state[1] is not image:
+                # 对象池回收的平台会跳到很远的位置，此时分开重绘两处
+                if old_rect.colliderect(rect):
+                    dirty.append(old_rect.union(rect))
+                else:
+                    dirty.append(old_rect.copy())
+                    dirty.append(rect.copy())
+                old_rect.update(rect)
+                state[1] = image
+
+        # 已被移除的精灵：擦除上一帧的位置
+        if len(self.sprite_state) > len(drawn):
+            for sprite, state in list(self.sprite_state.items()):
+                if state[2] != frame:
+                    dirty.append(state[0])
+                    del self.sprite_state[sprite]
+
+    def _collect_hud(self, game, dirty):
+        # HUD 控件只在数值变化时重新渲染，图像变了就重绘新旧两个区域
+        game.update_hud()
+        for widget in game.hud:
+            state = self.hud_state.get(widget)
+            if state is None:
+                self.hud_state[widget] = [widget.surface, widget.rect]
+                dirty.append(widget.rect)
+            elif state[0] is not widget.surface:
+                dirty.append(state[1])
+                dirty.append(widget.rect)
+                state[0] = widget.surface
+                state[1] = widget.rect
+
+    def _collect_particles(self, game, dirty):
+        # 粒子每帧都在移动：上一帧和本帧的图层区域都要重绘；返回本帧的 (图层, 矩形)
+        particles = game.particles.render() if game.particles else None
+        if self.particle_rect:
+            dirty.append(self.particle_rect)
+        self.particle_rect = particles[1] if particles else None
+        if particles:
+            dirty.append(particles[1])
+        return particles
+
+
+class TextureCanvas:
+    # 在可缩放窗口中模拟屏幕 Surface 的 fill / blit / blits，画完一帧后调用 present
+    def __init__(self, vsync=False):
+        from pygame._sdl2 import video
+
+        self.window = video.Window("NS-Shaft 简化版", size=(SCREEN_WIDTH, SCREEN_HEIGHT), resizable=True)
+        self.renderer = video.Renderer(self.window, accelerated=-1, vsync=vsync)
+        self.renderer.logical_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.texture_class = video.Texture
+        # Surface -> Texture；Surface 被释放（如文字缓存淘汰）时纹理随之释放。
+        # 上传后不应再修改 Surface 的像素，需要变化的图像每次使用新的 Surface
+        self.textures = weakref.WeakKeyDictionary()
+        self.uploads = 0
+
+    def get_width(self):
+        return SCREEN_WIDTH
+
+    def get_size(self):
+        return SCREEN_WIDTH, SCREEN_HEIGHT
+
+    def get_rect(self):
+        return pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    def texture(self, surface):
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = self.texture_class.from_surface(self.renderer, surface)
+            self.textures[surface] = texture
+            self.uploads += 1
+        return texture
+
+    def fill(self, color, rect=None):
+        renderer = self.renderer
+        renderer.draw_color = pygame.Color(color)
+        if rect is None:
+            renderer.clear()
+        else:
+            renderer.fill_rect(rect)
+
+    def blit(self, source, dest, area=None):
+        texture = self.texture(source)
+        if area is None:
+            texture.draw(dstrect=(dest[0], dest[1], texture.width, texture.height))
+        else:
+            area = pygame.Rect(area)
+            texture.draw(srcrect=area, dstrect=(dest[0], dest[1], area.width, area.height))
+
+    def blits(self, blit_sequence, doreturn=True):
+        for source, dest in blit_sequence:
+            self.blit(source, dest)
+
+    def present(self):
+        self.renderer.present()
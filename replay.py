@@ -0,0 +1,175 @@
+import argparse
+import os
+import struct
+import time
+
+from game import Game, FPS
+
+# 输入录制与回放
+# 文件格式（小端）：
+#   头部  4 字节魔数 b'NSRP'、1 字节版本号、8 字节随机种子、4 字节总帧数
+#   正文  若干段游程，每段首字节低 4 位为输入位（INPUT_*），高 4 位为游程长度减 1；
+#         高 4 位为 15 时，其后跟一个 LEB128 变长整数，表示游程长度减 16
+
+REPLAY_MAGIC = b'NSRP'
+REPLAY_VERSION = 3  # 2: 平台改由 level_gen 生成；3: 跳跃缓冲与土狼时间。旧录像无法重现
+HEADER = struct.Struct('<4sBQI')
+LONG_RUN = 15
+
+
+class InputRecorder:
+    def __init__(self, seed):
+        self.seed = seed
+        self.runs = []  # [输入位, 连续帧数]
+        self.ticks = 0
+
+    def record(self, inputs):
+        # 每帧调用一次，连续相同的输入合并为一段
+        if self.runs and self.runs[-1][0] == inputs:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([inputs, 1])
+        self.ticks += 1
+
+    def unrecord(self, ticks):
+        # 倒带时删除最后 ticks 帧的输入
+        self.ticks -= ticks
+        while ticks:
+            run = self.runs[-1]
+            count = min(ticks, run[1])
+            run[1] -= count
+            ticks -= count
+            if not run[1]:
+                self.runs.pop()
+
+    def to_bytes(self):
+        data = bytearray(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.ticks))
+        for inputs, count in self.runs:
+            if count <= LONG_RUN:
+                data.append(inputs | (count - 1) << 4)
+            else:
+                data.append(inputs | LONG_RUN << 4)
+                write_varint(data, count - LONG_RUN - 1)
+        return bytes(data)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+
+class Replay:
+    def __init__(self, seed, inputs):
+        self.seed = seed
+        self.inputs = inputs  # 每帧的输入位（bytes）
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, ticks = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("不是有效的回放文件")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"不支持的回放版本: {version}")
+
+        inputs = bytearray()
+        pos = HEADER.size
+        while pos < len(data):
+            byte = data[pos]
+            pos += 1
+            count = (byte >> 4) + 1
+            if count > LONG_RUN:
+                extra, pos = read_varint(data, pos)
+                count += extra
+            inputs.extend(bytes((byte & 0x0F,)) * count)
+
+        if len(inputs) != ticks:
+            raise ValueError(f"回放文件已损坏: 应有 {ticks} 帧，实际 {len(inputs)} 帧")
+        return cls(seed, bytes(inputs))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def run(self, game=None):
+        # 无头模式全速回放，返回结束时的游戏
+        game = game or Game(seed=self.seed)
+        for inputs in self.inputs:
+            game.step(inputs)
+        return game
+
+
+def write_varint(data, value):
+    while value >= 0x80:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def save_recording(recorder, directory):
+    # 以时间和种子命名保存一局录像（没有帧时跳过）
+    if recorder is None or recorder.ticks == 0:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{recorder.seed}.nsr")
+    recorder.save(path)
+    return path
+
+
+def play(replay):
+    # 以正常速度带画面回放
+    import pygame
+    from assets import Assets
+    from main import init_display
+
+    screen = init_display()
+    assets = Assets()
+    assets.load()
+    clock = pygame.time.Clock()
+    game = Game(assets, seed=replay.seed)
+
+    for inputs in replay.inputs:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                return game
+        game.step(inputs)
+        game.draw(screen)
+        pygame.display.flip()
+        clock.tick(FPS)
+
+    pygame.quit()
+    return game
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="回放 NS-Shaft 录像")
+    parser.add_argument('path', help="录像文件（.nsr）")
+    parser.add_argument('--headless', action='store_true', help="不显示画面，全速回放")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    start = time.perf_counter()
+    game = replay.run() if args.headless else play(replay)
+    elapsed = time.perf_counter() - start
+
+    print(f"种子: {replay.seed}  帧数: {len(replay.inputs)}")
+    print(f"分数: {game.score}  层数: {game.player.level}  生命值: {game.player.health}  "
+          f"游戏结束: {'是' if game.game_over else '否'}")
+    if args.headless and elapsed > 0:
+        print(f"回放速度: {len(replay.inputs) / elapsed:.0f} 帧/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import sys
+from array import array
+from collections import deque
+
+from game import FPS
+
+# 倒带缓冲：每个模拟步记录一次 Game.get_state，只保存最新的完整快照，
+# 更早的状态以反向差分保存（把较新的状态还原为前一个状态所需的字段），
+# 超出时长或内存预算时丢弃最旧的差分
+
+REWIND_SECONDS = 10  # 最多倒带的秒数
+MEMORY_BUDGET = 1 << 20  # 差分占用的内存上限（字节）
+
+
+class RewindBuffer:
+    def __init__(self, seconds=REWIND_SECONDS, budget=MEMORY_BUDGET):
+        self.max_ticks = seconds * FPS
+        self.budget = budget
+        self.current = None  # 最新状态的完整快照
+        # 反向差分 (长度, 下标 array('H'), 数值 array('d'), 帧数, 字节数)，最新的在右端
+        self.deltas = deque()
+        self.ticks = 0  # deltas 覆盖的帧数
+        self.idle = 0  # 最新快照之后状态没有变化的帧数（暂停或游戏结束）
+        self.memory = 0
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def clear(self):
+        # 重新开始一局时调用
+        self.current = None
+        self.deltas.clear()
+        self.ticks = 0
+        self.idle = 0
+        self.memory = 0
+
+    def record(self, game):
+        # 每个模拟步之后调用一次
+        state = game.get_state()
+        previous = self.current
+        if previous is None:
+            self.current = state
+            return
+
+        length = len(previous)
+        new_length = len(state)
+        indices = array('H', [i for i in range(length) if i >= new_length or state[i] != previous[i]])
+        if not indices and length == new_length:
+            self.idle += 1
+            return
+
+        values = array('d', [previous[i] for i in indices])
+        ticks = self.idle + 1
+        size = sys.getsizeof(indices) + sys.getsizeof(values)
+        self.deltas.append((length, indices, values, ticks, size))
+        self.current = state
+        self.ticks += ticks
+        self.idle = 0
+        self.memory += size
+
+        while self.deltas and (self.ticks > self.max_ticks or self.memory > self.budget):
+            _, _, _, ticks, size = self.deltas.popleft()
+            self.ticks -= ticks
+            self.memory -= size
+
+    def step_back(self, game):
+        # 把游戏还原到上一个不同的状态，返回回退的帧数（没有可回退的状态时返回 0）
+        if not self.deltas:
+            return 0
+        length, indices, values, ticks, size = self.deltas.pop()
+        state = self.current[:length]
+        if len(state) < length:
+            state.extend(array('d', bytes(8 * (length - len(state)))))
+        for i, value in zip(indices, values):
+            state[i] = value
+        game.set_state(state)
+
+        self.current = state
+        self.ticks -= ticks
+        self.memory -= size
+        ticks += self.idle
+        self.idle = 0
+        return ticks
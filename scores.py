@@ -0,0 +1,187 @@
+import argparse
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+
+# 本地排行榜
+#   scores.log  只追加的成绩日志，每条为定长记录（分数、层数、种子、时间）加 CRC32；
+#               写到一半的尾部记录在加载时丢弃
+#   scores.idx  前 TOP_SCORES 名的索引及其已包含的日志长度，整体替换写入；
+#               启动时只读索引和索引之后追加的日志，耗时与历史成绩总数无关
+# 磁盘写入都在后台线程中进行，游戏结束的那一帧只把成绩放进队列
+
+LOG_NAME = 'scores.log'
+INDEX_NAME = 'scores.idx'
+INDEX_MAGIC = b'NSHI'
+INDEX_VERSION = 1
+TOP_SCORES = 10  # 索引中保留的名次数
+
+ENTRY = struct.Struct('<IIQd')  # 分数, 层数, 种子, 时间（time.time()）
+RECORD = struct.Struct('<IIQdI')  # ENTRY 加 CRC32
+INDEX_HEADER = struct.Struct('<4sBQI')  # 魔数, 版本号, 已包含的日志字节数, 名次数
+
+
+def pack_record(entry):
+    data = ENTRY.pack(*entry)
+    return data + struct.pack('<I', zlib.crc32(data))
+
+
+def unpack_records(data):
+    # 返回完整且校验通过的记录，遇到损坏或不完整的记录即停止；同时返回有效部分的字节数
+    entries = []
+    pos = 0
+    while pos + RECORD.size <= len(data):
+        *entry, crc = RECORD.unpack_from(data, pos)
+        if zlib.crc32(data[pos:pos + ENTRY.size]) != crc:
+            break
+        entries.append(tuple(entry))
+        pos += RECORD.size
+    return entries, pos
+
+
+def rank_key(entry):
+    # 分数高者在前，同分时先取得者在前
+    return -entry[0], entry[3]
+
+
+class ScoreBoard:
+    def __init__(self, directory='.', top=TOP_SCORES):
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self.top_count = top
+        self.top = []  # 前 top 名 (分数, 层数, 种子, 时间)，按名次排列
+        self.queue = queue.Queue()  # (日志记录或 None, 名次快照)，None 表示结束
+
+        os.makedirs(directory, exist_ok=True)
+        self.log_length, replayed = self._load()
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+        if replayed:
+            # 上次退出前索引没来得及更新，补写一次
+            self.queue.put((None, list(self.top)))
+
+    def _load(self):
+        # 读取索引，再重放索引之后追加的日志；索引缺失或与日志不符时从头重放整个日志
+        offset = 0
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+            magic, version, offset, count = INDEX_HEADER.unpack_from(data)
+            entries, _ = unpack_records(data[INDEX_HEADER.size:])
+            if magic != INDEX_MAGIC or version != INDEX_VERSION or len(entries) != count:
+                raise ValueError("排行榜索引已损坏")
+            self.top = entries[:self.top_count]
+        except (OSError, struct.error, ValueError):
+            offset = 0
+
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < offset:
+                    # 日志比索引记录的短（被替换或截断过），索引作废
+                    self.top = []
+                    offset = 0
+                f.seek(offset)
+                tail = f.read()
+        except FileNotFoundError:
+            self.top = []
+            return 0, False
+
+        entries, size = unpack_records(tail)
+        if size < len(tail):
+            # 丢弃崩溃时写到一半的记录，之后的追加从完整记录末尾开始
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(offset + size)
+        for entry in entries:
+            self._insert(entry)
+        return offset + size, bool(entries)
+
+    def _insert(self, entry):
+        # 插入成绩，返回名次（从 1 开始），未进入前 top 名时返回 None
+        top = self.top
+        key = rank_key(entry)
+        rank = next((i for i, other in enumerate(top) if key < rank_key(other)), len(top))
+        if rank >= self.top_count:
+            return None
+        top.insert(rank, entry)
+        del top[self.top_count:]
+        return rank + 1
+
+    def submit(self, score, level, seed):
+        # 记录一局成绩，立即更新内存中的名次并返回名次；写盘由后台线程完成
+        entry = (score, level, seed, time.time())
+        rank = self._insert(entry)
+        self.queue.put((pack_record(entry), list(self.top)))
+        return rank
+
+    @property
+    def best(self):
+        return self.top[0][0] if self.top else 0
+
+    def _writer(self):
+        log = None
+        pending = None  # 尚未写入索引的名次快照
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            record, pending = item
+            try:
+                if record:
+                    if log is None:
+                        log = open(self.log_path, 'ab')
+                    log.write(record)
+                    log.flush()
+                    os.fsync(log.fileno())
+                    self.log_length += len(record)
+                # 队列中还有成绩时先追加日志，最后一次性更新索引
+                if self.queue.empty():
+                    self._write_index(pending)
+                    pending = None
+            except OSError as e:
+                print(f"无法保存成绩: {e}")
+        if log:
+            log.close()
+        if pending is not None:
+            self._write_index(pending)
+
+    def _write_index(self, top):
+        # 先写临时文件再替换，索引要么是旧的要么是新的，不会出现写了一半的情况
+        data = bytearray(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.log_length, len(top)))
+        for entry in top:
+            data += pack_record(entry)
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.index_path)
+
+    def close(self):
+        # 等待尚未写完的成绩写入磁盘
+        self.queue.put(None)
+        self.thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="显示 NS-Shaft 本地排行榜")
+    parser.add_argument('directory', nargs='?', default='.', help="排行榜文件所在目录")
+    args = parser.parse_args(argv)
+
+    board = ScoreBoard(args.directory)
+    board.close()
+    if not board.top:
+        print("还没有成绩")
+        return 0
+    print(f"{'名次':>4s} {'分数':>6s} {'层数':>4s} {'种子':>10s}  时间")
+    for rank, (score, level, seed, when) in enumerate(board.top, 1):
+        print(f"{rank:6d} {score:8d} {level:6d} {seed:12d}  {time.strftime('%Y-%m-%d %H:%M', time.localtime(when))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import pygame
+
+# 音效库：解码后的音效常驻内存，每种音效播放时只使用为它预留的几个声道，
+# 大量碰撞同时发生时同一音效最多只有 voices 个在响，新的会顶替最早开始的那个
+
+EXTRA_CHANNELS = 4  # 预留声道之外留给其他 Sound.play() 的声道数
+
+
+class SoundBank:
+    def __init__(self):
+        self.sounds = {}  # 名称 -> Sound
+        self.voices = {}  # 名称 -> 最多同时发声数
+        self.channels = {}  # 名称 -> 预留的 Channel 列表
+        self.next_channel = {}  # 名称 -> 下一次使用的声道下标（轮流使用，即最早开始的那个）
+
+    def __len__(self):
+        return len(self.sounds)
+
+    def __contains__(self, name):
+        return name in self.sounds
+
+    def get(self, name):
+        return self.sounds.get(name)
+
+    def add(self, name, sound, voices=1):
+        # 可在加载线程中调用；声道在 reserve_channels 中统一分配
+        self.sounds[name] = sound
+        self.voices[name] = voices
+
+    def reserve_channels(self):
+        # 在主线程、所有音效加载完成后调用：按每种音效的发声数预留声道
+        total = sum(self.voices.values())
+        if pygame.mixer.get_num_channels() < total + EXTRA_CHANNELS:
+            pygame.mixer.set_num_channels(total + EXTRA_CHANNELS)
+        pygame.mixer.set_reserved(total)
+
+        index = 0
+        for name, voices in self.voices.items():
+            self.channels[name] = [pygame.mixer.Channel(index + i) for i in range(voices)]
+            self.next_channel[name] = 0
+            index += voices
+
+    def play(self, name):
+        channels = self.channels.get(name)
+        if not channels:
+            return
+        i = self.next_channel[name]
+        self.next_channel[name] = (i + 1) % len(channels)
+        channels[i].play(self.sounds[name])
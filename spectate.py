@@ -0,0 +1,428 @@
+import argparse
+import asyncio
+import socket
+import struct
+import sys
+import threading
+import time
+from array import array
+
+from game import Game, FPS, GAME_STATE_SIZE, Player, Platform, SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, BLACK
+
+# 观战广播：主机把每个模拟步的 Game 状态编码为紧凑的二进制差分，由后台线程中的 asyncio TCP 服务器
+# 推送给任意多个观战端；观战端按顺序应用后用 Game.set_state + Game.draw 绘制
+# 消息格式（小端，每条前有 4 字节长度）：
+#   关键帧 b'K'  帧号 u32、种子 u64、HEADER_FIELDS 个全局与玩家字段 f64、平台数 u16，
+#               每个平台 serial u32 + PLATFORM_FIELDS 个字段 i16
+#   差分   b'D'  帧号 u32、全局与玩家字段的变化位 u32 及变化的字段 f64、
+#               移除的平台数 u16 及其 serial u32、新增或变化的平台数 u16，
+#               每个平台 serial u32、字段变化位 u8 及变化的字段 i16
+# 每个观战端有一个有界队列；队列满（客户端跟不上）时丢弃排队的帧，改发关键帧
+
+DEFAULT_PORT = 8765
+QUEUE_FRAMES = 30  # 每个观战端最多排队的帧数
+WRITE_BUFFER = 16 * 1024  # 发送缓冲（asyncio 与内核各一份）的上限，客户端跟不上时排队的帧很快被丢弃而不是越积越旧
+
+HEADER_FIELDS = GAME_STATE_SIZE + Player.STATE_SIZE
+PLATFORM_FIELDS = Platform.STATE_SIZE - 1  # 除 serial 外的字段：x, y, 类型, 移动方向, 破碎计时
+ALL_PLATFORM_FIELDS = (1 << PLATFORM_FIELDS) - 1
+
+LENGTH = struct.Struct('<I')
+COUNT = struct.Struct('<H')
+KEYFRAME = struct.Struct('<cIQ')
+DELTA = struct.Struct('<cII')
+HEADER_VALUES = struct.Struct(f'<{HEADER_FIELDS}d')
+PLATFORM_VALUES = struct.Struct(f'<I{PLATFORM_FIELDS}h')
+PLATFORM_CHANGE = struct.Struct('<IB')
+
+
+def split_state(state):
+    # Game.get_state -> (全局与玩家字段, {serial: 平台字段})
+    header = tuple(state[:HEADER_FIELDS])
+    platforms = {}
+    for i in range(HEADER_FIELDS, len(state), Platform.STATE_SIZE):
+        platforms[int(state[i + PLATFORM_FIELDS])] = tuple(int(value) for value in state[i:i + PLATFORM_FIELDS])
+    return header, platforms
+
+
+def join_state(header, platforms):
+    # split_state 的逆运算，结果可直接交给 Game.set_state
+    state = array('d', header)
+    for serial, fields in platforms.items():
+        state.extend(fields)
+        state.append(serial)
+    return state
+
+
+def encode_keyframe(tick, seed, header, platforms):
+    data = bytearray(KEYFRAME.pack(b'K', tick, seed))
+    data += HEADER_VALUES.pack(*header)
+    data += COUNT.pack(len(platforms))
+    for serial, fields in platforms.items():
+        data += PLATFORM_VALUES.pack(serial, *fields)
+    return LENGTH.pack(len(data)) + data
+
+
+def encode_delta(tick, old_header, old_platforms, header, platforms):
+    mask = 0
+    values = []
+    for i, (old, new) in enumerate(zip(old_header, header)):
+        if old != new:
+            mask |= 1 << i
+            values.append(new)
+    data = bytearray(DELTA.pack(b'D', tick, mask))
+    data += struct.pack(f'<{len(values)}d', *values)
+
+    removed = [serial for serial in old_platforms if serial not in platforms]
+    data += COUNT.pack(len(removed))
+    data += struct.pack(f'<{len(removed)}I', *removed)
+
+    changes = bytearray()
+    changed = 0
+    for serial, fields in platforms.items():
+        old = old_platforms.get(serial)
+        if old == fields:
+            continue
+        if old is None:
+            mask = ALL_PLATFORM_FIELDS
+            values = fields
+        else:
+            mask = 0
+            values = []
+            for i, (old_value, value) in enumerate(zip(old, fields)):
+                if old_value != value:
+                    mask |= 1 << i
+                    values.append(value)
+        changes += PLATFORM_CHANGE.pack(serial, mask)
+        changes += struct.pack(f'<{len(values)}h', *values)
+        changed += 1
+    data += COUNT.pack(changed)
+    data += changes
+    return LENGTH.pack(len(data)) + data
+
+
+class StateDecoder:
+    # 观战端：按顺序应用关键帧和差分（不含长度前缀），重建主机的状态
+    def __init__(self):
+        self.seed = None
+        self.tick = 0
+        self.header = None
+        self.platforms = {}
+
+    def apply(self, message):
+        # 返回 False 表示还没收到关键帧，差分无法应用
+        kind = message[:1]
+        if kind == b'K':
+            _, self.tick, self.seed = KEYFRAME.unpack_from(message)
+            pos = KEYFRAME.size
+            self.header = list(HEADER_VALUES.unpack_from(message, pos))
+            pos += HEADER_VALUES.size
+            count, = COUNT.unpack_from(message, pos)
+            pos += COUNT.size
+            self.platforms = {}
+            for _ in range(count):
+                serial, *fields = PLATFORM_VALUES.unpack_from(message, pos)
+                pos += PLATFORM_VALUES.size
+                self.platforms[serial] = fields
+            return True
+
+        if kind != b'D':
+            raise ValueError(f"未知的消息类型: {kind!r}")
+        if self.header is None:
+            return False
+        _, self.tick, mask = DELTA.unpack_from(message)
+        pos = DELTA.size
+        header = self.header
+        for i in range(HEADER_FIELDS):
+            if mask >> i & 1:
+                header[i], = struct.unpack_from('<d', message, pos)
+                pos += 8
+
+        count, = COUNT.unpack_from(message, pos)
+        pos += COUNT.size
+        for serial in struct.unpack_from(f'<{count}I', message, pos):
+            del self.platforms[serial]
+        pos += 4 * count
+
+        count, = COUNT.unpack_from(message, pos)
+        pos += COUNT.size
+        for _ in range(count):
+            serial, mask = PLATFORM_CHANGE.unpack_from(message, pos)
+            pos += PLATFORM_CHANGE.size
+            fields = self.platforms.setdefault(serial, [0] * PLATFORM_FIELDS)
+            for i in range(PLATFORM_FIELDS):
+                if mask >> i & 1:
+                    fields[i], = struct.unpack_from('<h', message, pos)
+                    pos += 2
+        return True
+
+    def state(self):
+        return join_state(self.header, self.platforms)
+
+
+class SpectatorConnection:
+    def __init__(self, writer):
+        self.writer = writer
+        self.address = writer.get_extra_info('peername')
+        self.queue = asyncio.Queue(QUEUE_FRAMES)
+        self.needs_keyframe = True
+        self.connected = time.perf_counter()
+        self.disconnected = None
+        self.bytes_sent = 0
+        self.frames = 0
+        self.dropped = 0
+
+    def stats(self):
+        # (地址, 连接秒数, 发送字节数, 发送帧数, 丢弃帧数)
+        seconds = (self.disconnected or time.perf_counter()) - self.connected
+        return self.address, seconds, self.bytes_sent, self.frames, self.dropped
+
+
+class Broadcaster:
+    # 主循环每个模拟步调用 publish；编码和发送都在服务器线程中进行，主循环从不等待网络
+    def __init__(self, host='0.0.0.0', port=DEFAULT_PORT):
+        self.loop = asyncio.new_event_loop()
+        self.server = None
+        self.error = None
+        self.connections = []
+        self.finished = []  # 已断开的连接
+        self.tasks = set()  # 各连接的处理任务，关闭时取消
+        self.previous = None  # 上一帧 (种子, 全局与玩家字段, 平台)，只在服务器线程中使用
+        self.tick = 0
+
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(host, port, ready), daemon=True)
+        self.thread.start()
+        ready.wait()
+        if self.error:
+            raise self.error
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def _run(self, host, port, ready):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(asyncio.start_server(self._serve, host, port))
+        except OSError as e:
+            self.error = e
+        ready.set()
+        if not self.error:
+            self.loop.run_forever()
+        self.loop.close()
+
+    def publish(self, game):
+        self.loop.call_soon_threadsafe(self._dispatch, game.seed, game.get_state())
+
+    def _dispatch(self, seed, state):
+        self.tick += 1
+        header, platforms = split_state(state)
+        previous = self.previous
+        self.previous = (seed, header, platforms)
+        keyframe = delta = None
+        for connection in self.connections:
+            queue = connection.queue
+            if queue.full():
+                # 客户端跟不上：丢弃排队的帧，改发关键帧
+                connection.dropped += queue.qsize()
+                while not queue.empty():
+                    queue.get_nowait()
+                connection.needs_keyframe = True
+            if connection.needs_keyframe or previous is None or previous[0] != seed:
+                if keyframe is None:
+                    keyframe = encode_keyframe(self.tick, seed, header, platforms)
+                queue.put_nowait(keyframe)
+                connection.needs_keyframe = False
+            else:
+                if delta is None:
+                    delta = encode_delta(self.tick, previous[1], previous[2], header, platforms)
+                queue.put_nowait(delta)
+
+    async def _serve(self, reader, writer):
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER)
+        writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, WRITE_BUFFER)
+        connection = SpectatorConnection(writer)
+        self.connections.append(connection)
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        try:
+            while True:
+                message = await connection.queue.get()
+                writer.write(message)
+                connection.bytes_sent += len(message)
+                connection.frames += 1
+                await writer.drain()
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            # 取消来自 _shutdown，按正常断开处理
+            pass
+        finally:
+            self.tasks.discard(task)
+            connection.disconnected = time.perf_counter()
+            self.connections.remove(connection)
+            self.finished.append(connection)
+            writer.close()
+
+    async def _shutdown(self):
+        # 取消仍在等待队列的连接任务，等它们的 finally 记录断开时间并关闭连接
+        self.server.close()
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def close(self):
+        # 连接任务全部结束后才停止事件循环
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def stats(self):
+        # 每个观战端的统计，见 SpectatorConnection.stats；在 close 之后调用
+        return [connection.stats() for connection in self.finished + self.connections]
+
+
+def format_bandwidth(address, seconds, total_bytes, frames, dropped=None):
+    host, port = address[:2]
+    rate = total_bytes / seconds / 1024 if seconds > 0 else 0.0
+    per_frame = total_bytes / frames if frames else 0.0
+    text = (f"{host}:{port}  {seconds:.1f} 秒  {total_bytes / 1024:.1f} KB  {rate:.2f} KB/s  "
+            f"{frames} 帧（平均 {per_frame:.0f} 字节）")
+    return text if dropped is None else f"{text}  丢弃 {dropped} 帧"
+
+
+class Spectator:
+    # 后台线程中的 asyncio 客户端：按顺序应用收到的消息，主线程用 take 取最新的状态
+    def __init__(self, host, port=DEFAULT_PORT):
+        self.decoder = StateDecoder()
+        self.lock = threading.Lock()
+        self.latest = None  # (种子, 状态)，被 take 取走后为 None
+        self.bytes_received = 0
+        self.frames = 0
+        self.started = None
+        self.closed = False
+        self.error = None
+        self.loop = asyncio.new_event_loop()
+        self.task = self.loop.create_task(self._receive(host, port))
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+        except OSError as e:
+            self.error = e
+        finally:
+            self.closed = True
+            self.loop.close()
+
+    async def _receive(self, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        self.started = time.perf_counter()
+        try:
+            while True:
+                size, = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+                message = await reader.readexactly(size)
+                self.bytes_received += LENGTH.size + size
+                self.frames += 1
+                if self.decoder.apply(message):
+                    state = self.decoder.state()
+                    with self.lock:
+                        self.latest = (self.decoder.seed, state)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    def take(self):
+        with self.lock:
+            latest = self.latest
+            self.latest = None
+        return latest
+
+    def close(self):
+        if not self.closed:
+            self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join()
+
+    def bandwidth(self):
+        # (秒数, 接收字节数, 帧数)
+        seconds = time.perf_counter() - self.started if self.started else 0.0
+        return seconds, self.bytes_received, self.frames
+
+
+def run_window(spectator, render):
+    # 带画面观战：收到的状态用 Game.set_state 恢复后按正常方式绘制，Esc 或关闭窗口退出
+    import pygame
+    from assets import Assets
+    from main import init_display, present
+
+    screen = init_display(texture=render == 'texture')
+    assets = Assets()
+    assets.load()
+    clock = pygame.time.Clock()
+    waiting_text = assets.text_cache.render(assets.font, "等待主机画面…", WHITE)
+    game = None
+    running = True
+    while running and not spectator.closed:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+
+        latest = spectator.take()
+        if latest:
+            seed, state = latest
+            if game is None:
+                game = Game(assets, seed=seed)
+            elif game.seed != seed:
+                game.restart(seed)
+            game.set_state(state)
+
+        if game:
+            game.draw(screen)
+        else:
+            screen.fill(BLACK)
+            screen.blit(waiting_text, (SCREEN_WIDTH // 2 - waiting_text.get_width() // 2, SCREEN_HEIGHT // 2))
+        present(screen)
+        clock.tick(FPS)
+    pygame.quit()
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(':')
+    if not host:
+        return text, DEFAULT_PORT
+    return host, int(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="观看 main.py --broadcast 广播的对局")
+    parser.add_argument('address', nargs='?', default='localhost', help=f"主机地址，HOST 或 HOST:PORT（默认端口 {DEFAULT_PORT}）")
+    parser.add_argument('--render', choices=['full', 'texture'], default='full', help="渲染方式")
+    parser.add_argument('--headless', action='store_true', help="不显示画面，只接收并统计带宽")
+    parser.add_argument('--seconds', type=float, help="无头模式下接收多少秒后退出（默认直到主机断开）")
+    args = parser.parse_args(argv)
+
+    host, port = parse_address(args.address)
+    spectator = Spectator(host, port)
+    if args.headless:
+        deadline = time.perf_counter() + args.seconds if args.seconds else None
+        try:
+            while not spectator.closed and (deadline is None or time.perf_counter() < deadline):
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            pass
+    else:
+        run_window(spectator, args.render)
+    spectator.close()
+
+    if spectator.error:
+        print(f"无法连接到 {host}:{port}: {spectator.error}")
+        return 1
+    seconds, total_bytes, frames = spectator.bandwidth()
+    print(format_bandwidth((host, port), seconds, total_bytes, frames))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+import batch
+import game
+import level_gen
+from batch import BatchGame
+from game import FPS, SCREEN_HEIGHT, PLAYER_SIZE, PLATFORM_WIDTH, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+
+# 难度调参：对参数组合的笛卡尔积，各跑同一组种子的无头对局（每个任务用 BatchGame 同步推进一批），
+# 任务分给进程池，汇总存活时间、到达层数和死因
+# 例：python sweep.py --games 2000 --param GRAVITY=0.4,0.5 --param PLATFORM_TYPE_WEIGHTS=1:1:1:1,4:1:1:1
+
+CHUNK_GAMES = 64  # 每个任务同步模拟的局数
+DEFAULT_SECONDS = 60  # 每局最长模拟时间
+
+
+def parse_number(text):
+    return int(text) if text.lstrip('-').isdigit() else float(text)
+
+
+def parse_weights(text):
+    # "4:1:1:1" -> (普通, 移动, 破碎, 弹簧) 的权重
+    weights = tuple(parse_number(value) for value in text.split(':'))
+    if len(weights) != len(level_gen.PLATFORM_TYPES):
+        raise ValueError(f"平台类型权重需要 {len(level_gen.PLATFORM_TYPES)} 项: {text}")
+    return weights
+
+
+# 可调参数及其解析函数；game、batch、level_gen 中同名的模块常量会被一起替换
+TUNABLE = {
+    'PLATFORM_SPEED': parse_number,
+    'MAX_PLATFORM_SPEED': parse_number,
+    'GRAVITY': parse_number,
+    'JUMP_POWER': parse_number,
+    'MAX_PLATFORMS': int,
+    'PLATFORM_TYPE_WEIGHTS': parse_weights,
+}
+DEFAULTS = {name: getattr(level_gen if name == 'PLATFORM_TYPE_WEIGHTS' else game, name) for name in TUNABLE}
+
+
+def apply_params(params):
+    # 在工作进程中设置本任务的参数（未指定的恢复默认值），并按新的跳跃参数重算可达性检查用的跳跃轨迹
+    values = dict(DEFAULTS, **params)
+    for module in (game, batch, level_gen):
+        for name, value in values.items():
+            if hasattr(module, name):
+                setattr(module, name, value)
+    level_gen.JUMP_ARC = level_gen.jump_arc(values['JUMP_POWER'], values['GRAVITY'])
+
+
+class RandomPolicy:
+    # 与 bench.scripted_inputs 相同的输入分布：按住方向键一段时间，间或跳跃；
+    # 每局的输入只由该局的种子决定，与任务划分和进程数无关
+    def __init__(self, seeds, max_ticks):
+        self.tick = 0
+        self.inputs = np.empty((len(seeds), max_ticks), dtype=np.int64)
+        ticks = np.arange(max_ticks)
+        for g, seed in enumerate(seeds):
+            rng = np.random.default_rng(seed)
+            change = rng.random(max_ticks) < 0.05
+            choice = rng.choice((0, INPUT_LEFT, INPUT_RIGHT), max_ticks)
+            jump = rng.random(max_ticks) < 0.03
+            last = np.maximum.accumulate(np.where(change, ticks, -1))
+            direction = np.where(last >= 0, choice[np.maximum(last, 0)], 0)
+            self.inputs[g] = direction | np.where(jump, INPUT_JUMP, 0)
+
+    def __call__(self, batch_game):
+        inputs = self.inputs[:, self.tick]
+        self.tick += 1
+        return inputs
+
+
+class SeekPolicy:
+    # 脚本策略：朝上方跳得到的最近平台移动，站在平台上时起跳
+    def __init__(self, seeds, max_ticks):
+        pass
+
+    def __call__(self, batch_game):
+        b = batch_game
+        jump_height = max(level_gen.JUMP_ARC)
+        feet = (b.player_y + PLAYER_SIZE)[:, None]
+        above = b.alive & (b.platform_y < feet) & (b.platform_y > feet - jump_height)
+        # 上方候选中取最低（最近）的一个
+        slots = np.argmax(np.where(above, b.platform_y, np.iinfo(np.int64).min), axis=1)
+        found = above.any(axis=1)
+        target = b.platform_x[np.arange(b.n), slots] + PLATFORM_WIDTH // 2
+        dx = target - (b.player_x + PLAYER_SIZE // 2)
+        inputs = np.where(dx < -PLATFORM_WIDTH // 4, INPUT_LEFT, np.where(dx > PLATFORM_WIDTH // 4, INPUT_RIGHT, 0))
+        inputs = np.where(found, inputs, 0)
+        return inputs | np.where(found & b.on_ground, INPUT_JUMP, 0)
+
+
+POLICIES = {'random': RandomPolicy, 'seek': SeekPolicy}
+
+
+def run_task(task):
+    # 工作进程：用一组参数模拟一批种子，返回每局的存活帧数、层数与死因
+    index, params, seeds, policy, max_ticks = task
+    apply_params(params)
+    batch_game = BatchGame(seeds)
+    batch_game.run(POLICIES[policy](seeds, max_ticks), max_ticks)
+    fell = batch_game.game_over & (batch_game.player_y > SCREEN_HEIGHT)
+    ceiling = batch_game.game_over & ~fell
+    return index, batch_game.ticks.tolist(), batch_game.level.tolist(), int(fell.sum()), int(ceiling.sum())
+
+
+def summarize(params, ticks, levels, fell, ceiling):
+    ticks = np.array(ticks)
+    levels = np.array(levels)
+    games = len(ticks)
+    return {
+        'params': params,
+        'games': games,
+        'survival_mean_s': float(ticks.mean() / FPS),
+        'survival_median_s': float(np.median(ticks) / FPS),
+        'level_mean': float(levels.mean()),
+        'level_max': int(levels.max()),
+        'deaths_ceiling': ceiling,
+        'deaths_fall': fell,
+        'survived': games - fell - ceiling,
+    }
+
+
+def sweep(grid, seeds, policy='random', max_ticks=DEFAULT_SECONDS * FPS, workers=None, chunk=CHUNK_GAMES):
+    # grid: {参数名: 取值列表}；返回每个参数组合的汇总结果（顺序与笛卡尔积一致）
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    tasks = [(index, params, seeds[start:start + chunk], policy, max_ticks)
+             for index, params in enumerate(combos)
+             for start in range(0, len(seeds), chunk)]
+
+    # 每个参数组合：[存活帧数列表, 层数列表, 坠落数, 天花板数]；统计量与任务完成顺序无关
+    collected = [[[], [], 0, 0] for _ in combos]
+    if workers == 1:
+        results = map(run_task, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap_unordered(run_task, tasks)
+    try:
+        for index, ticks, levels, fell, ceiling in results:
+            entry = collected[index]
+            entry[0] += ticks
+            entry[1] += levels
+            entry[2] += fell
+            entry[3] += ceiling
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        else:
+            apply_params({})
+
+    return [summarize(params, *entry) for params, entry in zip(combos, collected)]
+
+
+def format_params(params):
+    return ' '.join(f"{name}={':'.join(map(str, value)) if isinstance(value, tuple) else value}"
+                    for name, value in params.items()) or '(默认)'
+
+
+def print_table(summaries):
+    header = f"{'参数':40s} {'局数':>6s} {'平均存活':>8s} {'中位存活':>8s} {'平均层数':>8s} {'最高层':>6s} " \
+             f"{'天花板':>6s} {'坠落':>6s} {'存活':>6s}"
+    print(header)
+    for s in summaries:
+        games = s['games']
+        print(f"{format_params(s['params']):40s} {games:6d} {s['survival_mean_s']:7.1f}s {s['survival_median_s']:7.1f}s "
+              f"{s['level_mean']:8.2f} {s['level_max']:6d} "
+              f"{s['deaths_ceiling'] / games:6.1%} {s['deaths_fall'] / games:6.1%} {s['survived'] / games:6.1%}")
+
+
+def parse_param(text):
+    # "GRAVITY=0.4,0.5" -> ('GRAVITY', [0.4, 0.5])
+    name, _, values = text.partition('=')
+    if name not in TUNABLE or not values:
+        raise argparse.ArgumentTypeError(f"参数格式应为 名称=值1,值2,...，可调参数: {', '.join(TUNABLE)}")
+    try:
+        return name, [TUNABLE[name](value) for value in values.split(',')]
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NS-Shaft 难度参数扫描")
+    parser.add_argument('--param', type=parse_param, action='append', default=[],
+                        help="要扫描的参数及取值，可重复指定，例如 GRAVITY=0.4,0.5,0.6")
+    parser.add_argument('--games', type=int, default=1000, help="每组参数的局数")
+    parser.add_argument('--seed', type=int, default=0, help="第一局的种子，各组参数使用相同的种子")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random', help="输入策略")
+    parser.add_argument('--max-seconds', type=float, default=DEFAULT_SECONDS, help="每局最长模拟时间（秒）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="工作进程数")
+    parser.add_argument('--output', help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    grid = dict(args.param)
+    seeds = list(range(args.seed, args.seed + args.games))
+    start = time.perf_counter()
+    summaries = sweep(grid, seeds, args.policy, int(args.max_seconds * FPS), args.workers)
+    elapsed = time.perf_counter() - start
+
+    print_table(summaries)
+    print(f"共 {len(summaries) * len(seeds)} 局，用时 {elapsed:.1f} 秒（{args.workers} 个进程）")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'policy': args.policy, 'seed': args.seed, 'max_seconds': args.max_seconds,
+                       'results': summaries}, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+# 文字渲染缓存：按 (字体, 文字, 颜色) 缓存渲染结果，超出容量时淘汰最久未使用的项
+
+
+class TextCache:
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+# HUD 文字控件：只有数值变化时才重新渲染
+class HudText:
+    def __init__(self, cache, font, template, position, color):
+        self.cache = cache
+        self.font = font
+        self.template = template  # 例如 "分数: {}"
+        self.position = position
+        self.color = color
+        self.value = None
+        self.surface = None
+        self.rect = None
+
+    def set(self, value):
+        if self.surface is not None and value == self.value:
+            return False
+        self.value = value
+        self.surface = self.cache.render(self.font, self.template.format(value), self.color)
+        self.rect = self.surface.get_rect(topleft=self.position)
+        return True
+
+    def draw(self, surface):
+        surface.blit(self.surface, self.position)
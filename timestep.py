@@ -0,0 +1,69 @@
+import time
+
+from game import FPS
+
+# 固定时间步长：模拟按固定频率推进，与渲染帧率无关；渲染时在上一步与当前步之间插值
+
+MAX_CATCH_UP_STEPS = 5  # 单帧最多补跑的模拟步数，避免长时间卡顿后越补越慢
+SNAP_DISTANCE = 100  # 两步之间位移超过该值（如重新开始）时不插值
+
+
+class FixedTimestep:
+    def __init__(self, step_time=1 / FPS, max_steps=MAX_CATCH_UP_STEPS):
+        self.step_time = step_time
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.last = None
+        self.dropped_steps = 0  # 因超出补跑上限而丢弃的步数
+
+    def reset(self):
+        # 暂停模拟（如在菜单中）后调用，避免回到游戏时一次补跑很多步
+        self.accumulator = 0.0
+        self.last = None
+
+    def advance(self):
+        # 返回本帧需要推进的模拟步数
+        now = time.perf_counter()
+        if self.last is None:
+            self.last = now
+            return 1
+        self.accumulator += now - self.last
+        self.last = now
+
+        steps = int(self.accumulator // self.step_time)
+        self.accumulator -= steps * self.step_time
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+        return steps
+
+    @property
+    def alpha(self):
+        # 当前时间在两个模拟步之间的位置（0~1），用于插值
+        return min(1.0, self.accumulator / self.step_time)
+
+
+class Interpolation:
+    def __init__(self):
+        self.previous = {}  # 精灵 -> (serial, x, y)，最后一步之前的位置
+        self.alpha = 1.0
+
+    def capture(self, game):
+        # 在每帧最后一个模拟步之前调用
+        previous = self.previous
+        previous.clear()
+        for sprite in game.sprites():
+            previous[sprite] = (getattr(sprite, 'serial', -1), sprite.rect.x, sprite.rect.y)
+
+    def rect(self, sprite):
+        # 插值后的绘制位置；新生成或被对象池回收复用的平台直接用当前位置
+        rect = sprite.rect
+        previous = self.previous.get(sprite)
+        if previous is None or previous[0] != getattr(sprite, 'serial', -1):
+            return rect
+        dx = rect.x - previous[1]
+        dy = rect.y - previous[2]
+        if abs(dx) + abs(dy) > SNAP_DISTANCE:
+            return rect
+        alpha = self.alpha - 1
+        return rect.move(round(dx * alpha), round(dy * alpha))